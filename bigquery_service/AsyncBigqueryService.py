@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import base64
+import datetime
+from decimal import Decimal
+from typing import AsyncIterator, TYPE_CHECKING
+
+import httpx
+from google.cloud import bigquery
+from google.cloud.bigquery.dataset import Dataset
+from google.cloud.bigquery.table import Table
+
+from google_common.AsyncGoogleHttpClient import AsyncGoogleHttpClient
+from google_common.Instrumentation import Instrumentation, instrumented
+
+from .BigqueryClient import BigqueryClient
+from .BigqueryService import BigqueryService
+
+if TYPE_CHECKING:
+	import pandas as pd
+
+
+class AsyncBigqueryService:
+	"""Async counterpart of the read side of BigqueryService: dataset and table metadata, table rows and queries.
+
+	Creating, loading, inserting, copying, deleting and upserting stay on BigqueryService. They are long running jobs,
+	which async code can run concurrently through BigqueryJobManager.run_async.
+	"""
+	_BASE_URL = "https://bigquery.googleapis.com/bigquery/v2/projects"
+
+	_PAGE_SIZE = 10000
+	_QUERY_TIMEOUT_MS = 10000
+
+	def __init__(self, client: BigqueryClient, max_concurrency: int = 10, instrumentation: Instrumentation = None):
+		self._http = AsyncGoogleHttpClient(client.credentials, max_concurrency=max_concurrency)
+		self._billing_project_id = client.billing_project_id
+		self._instrumentation = instrumentation
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.aclose()
+
+	async def aclose(self):
+		await self._http.aclose()
+
+	@instrumented("bigquery_async.list_all_dataset_in_project")
+	async def list_all_dataset_in_project(self, project_id: str) -> list[str]:
+		dataset_ids: list[str] = []
+		async for page in self._http.iter_pages(f"{self.__class__._BASE_URL}/{project_id}/datasets"):
+			dataset_ids.extend(dataset["id"].replace(":", ".") for dataset in page.get("datasets", []))
+
+		return dataset_ids
+
+	@instrumented("bigquery_async.list_all_table_in_dataset")
+	async def list_all_table_in_dataset(self, project_id: str, dataset_name: str) -> list[str]:
+		return [table_id async for table_id in self.iter_all_table_in_dataset(project_id, dataset_name)]
+
+	@instrumented("bigquery_async.get_dataset_by_id")
+	async def get_dataset_by_id(self, project_id: str, dataset_name: str) -> Dataset:
+		resource = await self._http.request_json("GET", f"{self.__class__._BASE_URL}/{project_id}/datasets/{dataset_name}")
+
+		return Dataset.from_api_repr(resource)
+
+	@instrumented("bigquery_async.iter_all_table_in_dataset")
+	async def iter_all_table_in_dataset(self, project_id: str, dataset_name: str) -> AsyncIterator[str]:
+		tables_url = f"{self.__class__._BASE_URL}/{project_id}/datasets/{dataset_name}/tables"
+		async for page in self._http.iter_pages(tables_url):
+			for table in page.get("tables", []):
+				yield table["id"].replace(":", ".")
+
+	@instrumented("bigquery_async.get_table_by_id")
+	async def get_table_by_id(self, table_id: str) -> Table:
+		project_id, dataset_name, table_name = BigqueryService.split_table_id(table_id)
+		resource = await self._http.request_json(
+			"GET", f"{self.__class__._BASE_URL}/{project_id}/datasets/{dataset_name}/tables/{table_name}")
+
+		return Table.from_api_repr(resource)
+
+	@instrumented("bigquery_async.check_table_exists")
+	async def check_table_exists(self, table_id: str) -> bool:
+		try:
+			await self.get_table_by_id(table_id)
+			return True
+		except httpx.HTTPStatusError as e:
+			if e.response.status_code == 404:
+				return False
+			raise
+
+	@instrumented("bigquery_async.validate_table_id_does_not_exist")
+	async def validate_table_id_does_not_exist(self, table_id: str) -> str:
+		if await self.check_table_exists(table_id):
+			raise ValueError(f"Table with id {table_id} already exists")
+
+		return table_id
+
+	@instrumented("bigquery_async.validate_table_id_exists")
+	async def validate_table_id_exists(self, table_id: str) -> str:
+		if not await self.check_table_exists(table_id):
+			raise ValueError(f"Table with id {table_id} does not exist")
+
+		return table_id
+
+	@instrumented("bigquery_async.get_table_schema")
+	async def get_table_schema(self, table_id: str) -> dict[str, str]:
+		table = await self.get_table_by_id(table_id)
+
+		return {col_schema.name: col_schema.field_type for col_schema in table.schema}
+
+	@instrumented("bigquery_async.get_table_shape")
+	async def get_table_shape(self, table_id: str) -> tuple[int, int]:
+		try:
+			table = await self.get_table_by_id(table_id)
+		except httpx.HTTPStatusError as e:
+			if e.response.status_code == 404:
+				raise ValueError(f"Table with id {table_id} does not exist")
+			raise
+
+		return table.num_rows, len(table.schema)
+
+	@instrumented("bigquery_async.iter_table_rows")
+	async def iter_table_rows(self, table_id: str) -> AsyncIterator[dict]:
+		table = await self.get_table_by_id(table_id)
+		project_id, dataset_name, table_name = BigqueryService.split_table_id(table_id)
+
+		async for page in self._http.iter_pages(
+				f"{self.__class__._BASE_URL}/{project_id}/datasets/{dataset_name}/tables/{table_name}/data",
+				params={"maxResults": self.__class__._PAGE_SIZE}):
+			for row in page.get("rows", []):
+				yield self._convert_row_from_json(row, table.schema)
+
+	@instrumented("bigquery_async.iter_query_rows")
+	async def iter_query_rows(self, query_str: str) -> AsyncIterator[dict]:
+		response = await self._http.request_json(
+			"POST", f"{self.__class__._BASE_URL}/{self._billing_project_id}/queries",
+			json={"query": query_str, "useLegacySql": False, "maxResults": self.__class__._PAGE_SIZE,
+			      "timeoutMs": self.__class__._QUERY_TIMEOUT_MS}
+		)
+		job_reference = response["jobReference"]
+		results_url = f"{self.__class__._BASE_URL}/{job_reference['projectId']}/queries/{job_reference['jobId']}"
+		params = {"timeoutMs": self.__class__._QUERY_TIMEOUT_MS}
+		if job_reference.get("location"):
+			params["location"] = job_reference["location"]
+
+		# jobs.getQueryResults long-polls for up to timeoutMs, so waiting for the job needs no extra sleeping
+		while not response.get("jobComplete"):
+			response = await self._http.request_json("GET", results_url, params={**params, "maxResults": 0})
+
+		if "rows" not in response and response.get("totalRows", "0") != "0":
+			response = await self._http.request_json("GET", results_url,
+			                                         params={**params, "maxResults": self.__class__._PAGE_SIZE})
+
+		schema = [bigquery.SchemaField.from_api_repr(field) for field in response.get("schema", {}).get("fields", [])]
+		for row in response.get("rows", []):
+			yield self._convert_row_from_json(row, schema)
+
+		if response.get("pageToken"):
+			async for page in self._http.iter_pages(results_url,
+			                                        params={**params, "maxResults": self.__class__._PAGE_SIZE,
+			                                                "pageToken": response["pageToken"]}):
+				for row in page.get("rows", []):
+					yield self._convert_row_from_json(row, schema)
+
+	@instrumented("bigquery_async.get_data_from_query_into_pandas")
+	async def get_data_from_query_into_pandas(self, query_str: str) -> pd.DataFrame:
+		import pandas as pd
+
+		return pd.DataFrame([row async for row in self.iter_query_rows(query_str)])
+
+	@instrumented("bigquery_async.get_table_data_into_pandas")
+	async def get_table_data_into_pandas(self, table_id: str) -> pd.DataFrame:
+		import pandas as pd
+
+		return pd.DataFrame([row async for row in self.iter_table_rows(table_id)])
+
+	@classmethod
+	def _convert_row_from_json(cls, row: dict, schema: list[bigquery.SchemaField]) -> dict:
+		return {field.name: cls._convert_cell_from_json(cell["v"], field) for field, cell in zip(schema, row["f"])}
+
+	@classmethod
+	def _convert_cell_from_json(cls, value, field: bigquery.SchemaField):
+		if value is None:
+			return None
+
+		if field.mode == "REPEATED":
+			scalar_field = bigquery.SchemaField(name=field.name, field_type=field.field_type, fields=field.fields)
+			return [cls._convert_cell_from_json(item["v"], scalar_field) for item in value]
+
+		if field.field_type in ("RECORD", "STRUCT"):
+			return cls._convert_row_from_json(value, list(field.fields))
+
+		return cls._convert_scalar_from_json(value, field.field_type)
+
+	@staticmethod
+	def _convert_scalar_from_json(value: str, field_type: str):
+		if field_type in ("INTEGER", "INT64"):
+			return int(value)
+		if field_type in ("FLOAT", "FLOAT64"):
+			return float(value)
+		if field_type in ("NUMERIC", "BIGNUMERIC"):
+			return Decimal(value)
+		if field_type in ("BOOLEAN", "BOOL"):
+			return value.lower() == "true"
+		if field_type == "TIMESTAMP":
+			return datetime.datetime.fromtimestamp(float(value), tz=datetime.timezone.utc)
+		if field_type == "DATE":
+			return datetime.date.fromisoformat(value)
+		if field_type == "DATETIME":
+			return datetime.datetime.fromisoformat(value)
+		if field_type == "TIME":
+			return datetime.time.fromisoformat(value)
+		if field_type == "BYTES":
+			return base64.b64decode(value)
+
+		return value
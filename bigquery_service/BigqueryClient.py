@@ -1,8 +1,9 @@
 from google.cloud import bigquery
-from google.oauth2 import service_account, credentials
 from functools import cached_property
 from pathlib import Path
 
+from google_common.GoogleClientFactory import GoogleClientFactory
+
 
 class BigqueryClient:
 	_SCOPES = [
@@ -10,29 +11,40 @@ class BigqueryClient:
 		"https://www.googleapis.com/auth/drive",
 	]
 
-	def __init__(self, billing_project_id: str, sa_file_path: Path = None, adc_file_path: Path = None):
+	def __init__(self, billing_project_id: str, sa_file_path: Path = None, adc_file_path: Path = None,
+	             client_factory: GoogleClientFactory = None):
 		self._billing_project_id = billing_project_id
 		self._sa_file_path = sa_file_path
 		self._adc_file_path = adc_file_path
+		self._client_factory = client_factory or GoogleClientFactory.default()
 
 	def _get_service_account_credentials(self):
-		return service_account.Credentials.from_service_account_file(
-			self._sa_file_path.as_posix(),
-			scopes=self.__class__._SCOPES
-		)
+		return self._client_factory.get_service_account_credentials(self._sa_file_path, scopes=self.__class__._SCOPES)
 
 	def _get_authorized_user_credentials(self):
-		return credentials.Credentials.from_authorized_user_file(
-			self._adc_file_path.as_posix(), scopes=self.__class__._SCOPES
-		)
+		return self._client_factory.get_authorized_user_credentials(self._adc_file_path, scopes=self.__class__._SCOPES)
+
+	@property
+	def billing_project_id(self) -> str:
+		return self._billing_project_id
 
 	@cached_property
-	def service(self):
+	def credentials(self):
 		if self._sa_file_path:
-			creds = self._get_service_account_credentials()
-			return bigquery.client.Client(credentials=creds, project=self._billing_project_id)
+			return self._get_service_account_credentials()
 		elif self._adc_file_path:
-			creds = self._get_authorized_user_credentials()
-			return bigquery.client.Client(credentials=creds, project=self._billing_project_id)
+			return self._get_authorized_user_credentials()
 		else:
 			raise TypeError("Please provide at least one valid service account or user account info")
+
+	@cached_property
+	def service(self):
+		return bigquery.client.Client(credentials=self.credentials, project=self._billing_project_id,
+		                              _http=self._client_factory.get_authorized_session(self.credentials))
+
+	@cached_property
+	def storage_service(self):
+		from google.cloud import storage
+
+		return storage.Client(credentials=self.credentials, project=self._billing_project_id,
+		                      _http=self._client_factory.get_authorized_session(self.credentials))
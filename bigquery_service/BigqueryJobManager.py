@@ -0,0 +1,187 @@
+import asyncio
+import time
+from concurrent.futures import Future
+from typing import Callable, Union
+
+from google.cloud import bigquery
+
+from google_common.Instrumentation import Instrumentation, instrumented
+
+from .bigquery_custom_types.JobStatistics import JobStatistics
+
+BigqueryJob = Union[bigquery.QueryJob, bigquery.LoadJob, bigquery.CopyJob, bigquery.ExtractJob]
+
+
+class BigqueryJobManager:
+	_MIN_POLL_INTERVAL_SECONDS = 0.5
+	_MAX_POLL_INTERVAL_SECONDS = 10
+	_POLL_INTERVAL_MULTIPLIER = 1.5
+
+	_WRITE_DISPOSITION = ["WRITE_APPEND", "WRITE_TRUNCATE", "WRITE_EMPTY"]
+
+	def __init__(self, service: bigquery.Client, max_concurrent_jobs: int = 10,
+	             on_job_finished: Callable[[BigqueryJob], None] = None, instrumentation: Instrumentation = None):
+		"""on_job_finished is called with every job that ran, before its future is resolved."""
+		if max_concurrent_jobs < 1:
+			raise ValueError("Max concurrent jobs must be at least 1")
+
+		self._service = service
+		self._max_concurrent_jobs = max_concurrent_jobs
+		self._on_job_finished = on_job_finished
+		self._instrumentation = instrumentation
+		self._create_job_functions: dict[str, Callable[[bigquery.Client], BigqueryJob]] = dict()
+		self._dependencies: dict[str, list[str]] = dict()
+		self._futures: dict[str, Future] = dict()
+		self._statistics: dict[str, JobStatistics] = dict()
+
+	@property
+	def statistics(self) -> dict[str, JobStatistics]:
+		return dict(self._statistics)
+
+	def submit(self, name: str, create_job: Callable[[bigquery.Client], BigqueryJob],
+	           depends_on: list[str] = None) -> Future:
+		"""Register a job, create_job receives the BigQuery client and must start the job and return it.
+
+		Dependencies have to be registered first, which also guarantees that the job graph has no cycle.
+		"""
+		if name in self._futures:
+			raise ValueError(f"Job with name {name} already exists")
+
+		depends_on = depends_on or []
+		for dependency in depends_on:
+			if dependency not in self._futures:
+				raise ValueError(f"Job {name} depends on unknown job {dependency}")
+
+		self._create_job_functions[name] = create_job
+		self._dependencies[name] = depends_on
+		self._futures[name] = Future()
+
+		return self._futures[name]
+
+	def submit_query(self, name: str, query_string: str, destination_table_id: str = None,
+	                 write_disposition: str = None, depends_on: list[str] = None) -> Future:
+		job_config_info = dict()
+		if destination_table_id:
+			job_config_info["destination"] = destination_table_id
+		if write_disposition:
+			if write_disposition not in self.__class__._WRITE_DISPOSITION:
+				raise ValueError(f"Write disposition must be either {', '.join(self.__class__._WRITE_DISPOSITION)}")
+			job_config_info["write_disposition"] = write_disposition
+
+		return self.submit(
+			name,
+			lambda service: service.query(query_string, job_config=bigquery.QueryJobConfig(**job_config_info)),
+			depends_on
+		)
+
+	def submit_copy(self, name: str, source_table_id: str, destination_table_id: str,
+	                depends_on: list[str] = None) -> Future:
+		return self.submit(name, lambda service: service.copy_table(source_table_id, destination_table_id),
+		                   depends_on)
+
+	def submit_load_from_uri(self, name: str, source_uris: list[str] | str, table_id: str,
+	                         job_config: bigquery.LoadJobConfig, depends_on: list[str] = None) -> Future:
+		return self.submit(name, lambda service: service.load_table_from_uri(source_uris, table_id,
+		                                                                     job_config=job_config), depends_on)
+
+	@instrumented("bigquery.job_manager.run")
+	def run(self) -> dict[str, JobStatistics]:
+		pending_names = [name for name, future in self._futures.items() if not future.done()]
+		running_jobs: dict[str, BigqueryJob] = dict()
+		poll_interval = self.__class__._MIN_POLL_INTERVAL_SECONDS
+
+		while pending_names or running_jobs:
+			for name in list(pending_names):
+				failed_dependencies = [dependency for dependency in self._dependencies[name] if
+				                       self._check_future_failed(self._futures[dependency])]
+				if failed_dependencies:
+					pending_names.remove(name)
+					self._set_job_skipped(name, failed_dependencies[0])
+				elif len(running_jobs) < self._max_concurrent_jobs and all(
+						self._futures[dependency].done() for dependency in self._dependencies[name]):
+					pending_names.remove(name)
+					job = self._start_job(name)
+					if job is not None:
+						running_jobs[name] = job
+
+			if not running_jobs:
+				continue
+
+			finished_names = [name for name, job in running_jobs.items() if job.done()]
+			for name in finished_names:
+				self._set_job_finished(name, running_jobs.pop(name))
+
+			# Poll quickly while jobs keep finishing and back off while every running job is still busy
+			if finished_names:
+				poll_interval = self.__class__._MIN_POLL_INTERVAL_SECONDS
+			else:
+				time.sleep(poll_interval)
+				poll_interval = min(poll_interval * self.__class__._POLL_INTERVAL_MULTIPLIER,
+				                    self.__class__._MAX_POLL_INTERVAL_SECONDS)
+
+		return self.statistics
+
+	@instrumented("bigquery.job_manager.run_async")
+	async def run_async(self) -> dict[str, JobStatistics]:
+		return await asyncio.to_thread(self.run)
+
+	def wrap_future(self, name: str) -> asyncio.Future:
+		return asyncio.wrap_future(self._futures[name])
+
+	@staticmethod
+	def _check_future_failed(future: Future) -> bool:
+		return future.done() and (future.cancelled() or future.exception() is not None)
+
+	def _start_job(self, name: str):
+		future = self._futures[name]
+		if not future.set_running_or_notify_cancel():
+			self._statistics[name] = JobStatistics(name=name, state="CANCELLED")
+			return None
+
+		try:
+			return self._create_job_functions[name](self._service)
+		except Exception as e:
+			self._statistics[name] = JobStatistics(name=name, state="FAILED", error=str(e))
+			future.set_exception(e)
+			return None
+
+	def _set_job_finished(self, name: str, job: BigqueryJob):
+		if self._on_job_finished is not None:
+			self._on_job_finished(job)
+
+		try:
+			job.result()
+		except Exception as e:
+			self._statistics[name] = self._create_job_statistics(name, job, "FAILED", str(e))
+			self._futures[name].set_exception(e)
+		else:
+			self._statistics[name] = self._create_job_statistics(name, job, "DONE")
+			self._futures[name].set_result(job)
+
+	def _set_job_skipped(self, name: str, failed_dependency: str):
+		error = f"Job {name} was skipped because its dependency {failed_dependency} failed"
+		self._statistics[name] = JobStatistics(name=name, state="SKIPPED", error=error)
+		if self._futures[name].set_running_or_notify_cancel():
+			self._futures[name].set_exception(RuntimeError(error))
+
+	@staticmethod
+	def _create_job_statistics(name: str, job: BigqueryJob, state: str, error: str = None) -> JobStatistics:
+		duration_seconds = None
+		if job.started and job.ended:
+			duration_seconds = (job.ended - job.started).total_seconds()
+
+		return JobStatistics(
+			name=name,
+			state=state,
+			job_id=job.job_id,
+			job_type=job.job_type,
+			created=job.created,
+			started=job.started,
+			ended=job.ended,
+			duration_seconds=duration_seconds,
+			total_bytes_processed=getattr(job, "total_bytes_processed", None) or getattr(job, "input_file_bytes",
+			                                                                             None),
+			total_bytes_billed=getattr(job, "total_bytes_billed", None),
+			slot_millis=getattr(job, "slot_millis", None),
+			error=error
+		)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+from uuid import uuid4
+
+if TYPE_CHECKING:
+	import pandas as pd
+
+
+class BigqueryQueryCache:
+	_FILE_SUFFIX = ".arrow"
+	_NON_DETERMINISTIC_FUNCTION_PATTERN = re.compile(
+		r"\b(CURRENT_DATE|CURRENT_DATETIME|CURRENT_TIME|CURRENT_TIMESTAMP|RAND|GENERATE_UUID|SESSION_USER)\b",
+		re.IGNORECASE
+	)
+
+	def __init__(self, cache_dir: Path, max_size_bytes: int = 1024 * 1024 * 1024):
+		self._cache_dir = cache_dir
+		self._max_size_bytes = max_size_bytes
+		self._lock = threading.Lock()
+		self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+	@staticmethod
+	def normalize_query(query_str: str) -> str:
+		# Whitespace inside the query is kept as is, collapsing it would also rewrite the string literals
+		return query_str.strip().rstrip(";").strip()
+
+	@classmethod
+	def check_query_is_deterministic(cls, query_str: str) -> bool:
+		return cls._NON_DETERMINISTIC_FUNCTION_PATTERN.search(query_str) is None
+
+	@classmethod
+	def create_cache_key(cls, query_str: str, table_modified_dict: dict[str, datetime]) -> str:
+		"""The key is made of a hash of the query and a hash of the source tables' freshness.
+
+		Keeping the query hash as a prefix lets a new result replace every stale result of the same query.
+		"""
+		query_hash = hashlib.sha256(cls.normalize_query(query_str).encode("UTF-8")).hexdigest()[:32]
+		freshness_str = ";".join(f"{table_id}={modified.isoformat() if modified else ''}"
+		                         for table_id, modified in sorted(table_modified_dict.items()))
+		freshness_hash = hashlib.sha256(freshness_str.encode("UTF-8")).hexdigest()[:32]
+
+		return f"{query_hash}-{freshness_hash}"
+
+	def get(self, cache_key: str) -> Optional[pd.DataFrame]:
+		import pyarrow as pa
+
+		file_path = self._get_file_path(cache_key)
+
+		try:
+			with pa.memory_map(file_path.as_posix(), "r") as source:
+				df = pa.ipc.open_file(source).read_all().to_pandas()
+			# The modification time doubles as last access time for the LRU eviction
+			os.utime(file_path)
+		except (FileNotFoundError, pa.ArrowInvalid):
+			return None
+
+		return df
+
+	def put(self, cache_key: str, df: pd.DataFrame):
+		import pyarrow as pa
+
+		arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+		file_path = self._get_file_path(cache_key)
+		temp_file_path = self._cache_dir / f"{uuid4().hex}.tmp"
+
+		with pa.OSFile(temp_file_path.as_posix(), "wb") as sink:
+			with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+				writer.write_table(arrow_table)
+
+		with self._lock:
+			query_hash = cache_key.split("-")[0]
+			for stale_file_path in self._cache_dir.glob(f"{query_hash}-*{self.__class__._FILE_SUFFIX}"):
+				stale_file_path.unlink(missing_ok=True)
+
+			os.replace(temp_file_path, file_path)
+			self._evict()
+
+	def clear(self):
+		with self._lock:
+			for file_path in self._cache_dir.glob(f"*{self.__class__._FILE_SUFFIX}"):
+				file_path.unlink(missing_ok=True)
+
+	def get_size_bytes(self) -> int:
+		return sum(file_path.stat().st_size for file_path in self._cache_dir.glob(f"*{self.__class__._FILE_SUFFIX}"))
+
+	def _get_file_path(self, cache_key: str) -> Path:
+		return self._cache_dir / f"{cache_key}{self.__class__._FILE_SUFFIX}"
+
+	def _evict(self):
+		file_stats = []
+		for file_path in self._cache_dir.glob(f"*{self.__class__._FILE_SUFFIX}"):
+			try:
+				file_stats.append((file_path, file_path.stat()))
+			except FileNotFoundError:
+				continue
+
+		total_size = sum(stat.st_size for _, stat in file_stats)
+		for file_path, stat in sorted(file_stats, key=lambda file_stat: file_stat[1].st_mtime):
+			if total_size <= self._max_size_bytes:
+				break
+
+			file_path.unlink(missing_ok=True)
+			total_size -= stat.st_size
@@ -1,12 +1,33 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from tempfile import SpooledTemporaryFile, TemporaryDirectory
+from typing import Optional, TYPE_CHECKING
+from uuid import uuid4
 from google.cloud import bigquery
 from google.cloud.bigquery.dataset import Dataset
 from google.cloud.bigquery.table import Table
 from google.cloud.exceptions import NotFound
 
-import pandas as pd
+import datetime
+import glob
+import gzip
+import shutil
+import time
+
+from google_common.Instrumentation import Instrumentation, instrumented, iter_page_items, map_in_context
 
 from .BigqueryClient import BigqueryClient
+from .BigqueryJobManager import BigqueryJobManager
+from .BigqueryQueryCache import BigqueryQueryCache
+from .TableMetadataCache import TableMetadataCache
+from .bigquery_custom_types.LoadJobReport import LoadJobReport
+
+# pandas and pyarrow are only imported by the methods that need them to keep the import of the service cheap
+if TYPE_CHECKING:
+	import pandas as pd
+	import pyarrow as pa
 
 
 class BigqueryService:
@@ -22,63 +43,123 @@ class BigqueryService:
 		"WRITE_TRUNCATE": bigquery.WriteDisposition.WRITE_TRUNCATE
 	}
 
-	def __init__(self, client: BigqueryClient):
+	_MAX_REFERENCED_TABLES = 50
+
+	_PARQUET_COMPRESSION = ["SNAPPY", "GZIP", "ZSTD", "LZ4", "BROTLI", "NONE"]
+
+	_STAGING_TABLE_EXPIRATION = datetime.timedelta(days=1)
+
+	# Parquet files smaller than this are kept in memory, bigger ones are spilled to a temporary file
+	_PARQUET_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+	def __init__(self, client: BigqueryClient, query_cache: BigqueryQueryCache = None,
+	             table_metadata_ttl_seconds: float = 60, instrumentation: Instrumentation = None):
+		self._client = client
 		self._service = client.service
+		self._query_cache = query_cache
+		self._table_metadata_cache = TableMetadataCache(ttl_seconds=table_metadata_ttl_seconds)
+		self._instrumentation = instrumentation
 
+	@property
+	def table_metadata_cache(self) -> TableMetadataCache:
+		return self._table_metadata_cache
+
+	def create_job_manager(self, max_concurrent_jobs: int = 10) -> BigqueryJobManager:
+		return BigqueryJobManager(self._service, max_concurrent_jobs=max_concurrent_jobs,
+		                          on_job_finished=self._invalidate_job_destination,
+		                          instrumentation=self._instrumentation)
+
+	@instrumented("bigquery.list_all_dataset_in_project")
 	def list_all_dataset_in_project(self, project_id: str) -> list[str]:
-		datasets = list(self._service.list_datasets(project=project_id, include_all=False))
+		datasets = list(iter_page_items(self._service.list_datasets(project=project_id, include_all=False)))
 
 		return [dataset.full_dataset_id.replace(":", ".") for dataset in datasets]
 
+	@instrumented("bigquery.list_all_table_in_dataset")
 	def list_all_table_in_dataset(self, project_id: str, dataset_name: str) -> list[str]:
 		dataset = self.get_dataset_by_id(project_id, dataset_name)
-		tables = self._service.list_tables(dataset)
+		tables = iter_page_items(self._service.list_tables(dataset))
 
 		return [table.full_table_id.replace(":", ".") for table in tables]
 
+	@instrumented("bigquery.get_dataset_by_id")
 	def get_dataset_by_id(self, project_id: str, dataset_name: str) -> Dataset:
 		dataset_ref = self._get_dataset_ref(project_id=project_id, dataset_name=dataset_name)
 
 		return self._service.get_dataset(dataset_ref=dataset_ref)
 
+	@instrumented("bigquery.get_table_by_id")
 	def get_table_by_id(self, table_id: str) -> Table:
+		table = self._table_metadata_cache.get(table_id)
+		if table is not None:
+			return table
+
 		project_id, dataset_name, table_name = self.split_table_id(table_id)
 		table_ref = self._get_table_ref(project_id=project_id, dataset_name=dataset_name, table_name=table_name)
+		table = self._service.get_table(table=table_ref)
+		self._table_metadata_cache.put(table_id, table)
+
+		return table
 
-		return self._service.get_table(table=table_ref)
+	@instrumented("bigquery.prefetch_table_metadata_in_dataset")
+	def prefetch_table_metadata_in_dataset(self, project_id: str, dataset_name: str, max_workers: int = 8):
+		tables = iter_page_items(
+			self._service.list_tables(self._get_dataset_ref(project_id=project_id, dataset_name=dataset_name)))
+		table_ids = [table.full_table_id.replace(":", ".") for table in tables]
 
+		# list_tables only returns partial metadata, the full tables are fetched concurrently
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			for table_id, table in zip(table_ids, map_in_context(executor, self._service.get_table, table_ids)):
+				self._table_metadata_cache.put(table_id, table)
+
+	@instrumented("bigquery.validate_table_id_does_not_exist")
 	def validate_table_id_does_not_exist(self, table_id: str) -> str:
 		if self.check_table_exists(table_id):
 			raise ValueError(f"Table with id {table_id} already exists")
 
 		return table_id
 
+	@instrumented("bigquery.validate_table_id_exists")
 	def validate_table_id_exists(self, table_id: str) -> str:
 		if not self.check_table_exists(table_id):
 			raise ValueError(f"Table with id {table_id} does not exist")
 
 		return table_id
 
+	@instrumented("bigquery.get_table_data_into_pandas")
 	def get_table_data_into_pandas(self, table_id: str) -> pd.DataFrame:
 		table_id = self.validate_table_id_exists(table_id)
 
 		return self.get_data_from_query_into_pandas(f"SELECT * FROM {table_id}")
 
-	def get_data_from_query_into_pandas(self, query_str: str) -> pd.DataFrame:
-		query_job = self._service.query(query_str)
+	@instrumented("bigquery.get_data_from_query_into_pandas")
+	def get_data_from_query_into_pandas(self, query_str: str, use_query_cache: bool = True) -> pd.DataFrame:
+		cache_key = self._get_query_cache_key(query_str) if self._query_cache and use_query_cache else None
+		if cache_key is None:
+			return self._run_query_into_pandas(query_str)
 
-		return query_job.result().to_dataframe()
+		df = self._query_cache.get(cache_key)
+		if df is None:
+			df = self._run_query_into_pandas(query_str)
+			self._query_cache.put(cache_key, df)
 
+		return df
+
+	@instrumented("bigquery.insert_rows_into_table")
 	def insert_rows_into_table(self, table_id: str, insert_rows: list[dict]):
 		table_id = self.validate_table_id_exists(table_id)
 		self._service.insert_rows_json(table_id, insert_rows)
+		self._table_metadata_cache.invalidate(table_id)
 
-	def get_data_from_sql_script_file_into_pandas(self, sql_file_path: Path) -> pd.DataFrame:
+	@instrumented("bigquery.get_data_from_sql_script_file_into_pandas")
+	def get_data_from_sql_script_file_into_pandas(self, sql_file_path: Path,
+	                                              use_query_cache: bool = True) -> pd.DataFrame:
 		with open(sql_file_path, "r") as file:
 			query_string = file.read()
 
-		return self.get_data_from_query_into_pandas(query_string)
+		return self.get_data_from_query_into_pandas(query_string, use_query_cache=use_query_cache)
 
+	@instrumented("bigquery.get_table_schema")
 	def get_table_schema(self, table_id: str) -> dict[str, str]:
 		table = self.get_table_by_id(table_id)
 
@@ -88,13 +169,14 @@ class BigqueryService:
 
 		return table_schema
 
+	@instrumented("bigquery.get_table_shape")
 	def get_table_shape(self, table_id: str) -> tuple[int, int]:
 		table_id = self.validate_table_id_exists(table_id)
-		table_schema = self.get_table_schema(table_id)
 		table = self.get_table_by_id(table_id)
 
-		return table.num_rows, len(table_schema)
+		return table.num_rows, len(table.schema)
 
+	@instrumented("bigquery.create_empty_table_with_schema")
 	def create_empty_table_with_schema(self, table_id: str, schema_dict: dict[str, str],
 	                                   time_partition_type: str = None, partition_col: str = None):
 		table_id = self.validate_table_id_does_not_exist(table_id)
@@ -108,13 +190,18 @@ class BigqueryService:
 			table.time_partitioning = self._create_time_partitioning_info(time_partition_type, partition_col)
 			self._service.create_table(table)
 
+		self._table_metadata_cache.invalidate(table_id)
+
+	@instrumented("bigquery.create_table_from_query")
 	def create_table_from_query(self, table_id: str, query_string: str):
 		table_id = self.validate_table_id_does_not_exist(table_id)
 		job_config = bigquery.QueryJobConfig(destination=table_id)
 		query_job = self._service.query(query_string, job_config=job_config)
 
 		query_job.result()
+		self._table_metadata_cache.invalidate(table_id)
 
+	@instrumented("bigquery.create_table_from_csv_file")
 	def create_table_from_csv_file(self, table_id: str, csv_file_path: str, schema_dict: dict[str, str] = None,
 	                               time_partition_type: str = None, partition_col: str = None):
 		table_id = self.validate_table_id_does_not_exist(table_id)
@@ -137,8 +224,9 @@ class BigqueryService:
 		load_job = self._create_load_csv_job(csv_file_path_str=csv_file_path, job_config_info=job_config_info,
 		                                     table_id=table_id)
 		load_job.result()
-		self._service.get_table(table_id)
+		self._table_metadata_cache.invalidate(table_id)
 
+	@instrumented("bigquery.insert_into_table_from_csv_file")
 	def insert_into_table_from_csv_file(self, table_id: str, csv_file_path: str, write_disposition: str):
 		if write_disposition not in self.__class__._WRITE_DISPOSITION:
 			raise ValueError(f"Write disposition must be either {', '.join(self.__class__._WRITE_DISPOSITION.keys())}")
@@ -155,8 +243,184 @@ class BigqueryService:
 		load_job = self._create_load_csv_job(csv_file_path_str=csv_file_path, job_config_info=job_config_info,
 		                                     table_id=table_id)
 		load_job.result()
-		self._service.get_table(table_id)
+		self._table_metadata_cache.invalidate(table_id)
+
+	@instrumented("bigquery.load_dataframe")
+	def load_dataframe(self, table_id: str, df: pd.DataFrame, write_disposition: str = "WRITE_APPEND",
+	                   time_partition_type: str = None, partition_col: str = None, compression: str = "SNAPPY",
+	                   chunk_size: int = None):
+		job_config_info = self._create_load_parquet_job_config_info(write_disposition, time_partition_type,
+		                                                            partition_col)
+		import pyarrow as pa
+
+		arrow_schema = pa.Schema.from_pandas(df, preserve_index=False)
+		# An existing table keeps its own schema (REQUIRED modes, TIMESTAMP or NUMERIC columns), the Arrow types only
+		# describe the columns of a new table
+		try:
+			job_config_info["schema"] = self.get_table_by_id(table_id).schema
+		except NotFound:
+			job_config_info["schema"] = self._create_schema_field_list_from_arrow_schema(arrow_schema)
+
+		load_job = self._create_load_dataframe_job(df=df, job_config_info=job_config_info, table_id=table_id,
+		                                           compression=compression, chunk_size=chunk_size,
+		                                           arrow_schema=arrow_schema)
+		load_job.result()
+		self._table_metadata_cache.invalidate(table_id)
+
+	@instrumented("bigquery.load_parquet_files")
+	def load_parquet_files(self, table_id: str, parquet_file_paths: list[str], write_disposition: str = "WRITE_APPEND",
+	                       time_partition_type: str = None, partition_col: str = None):
+		job_config_info = self._create_load_parquet_job_config_info(write_disposition, time_partition_type,
+		                                                            partition_col)
+
+		gcs_uris = [file_path for file_path in parquet_file_paths if file_path[:3] == "gs:"]
+		local_file_paths = [file_path for file_path in parquet_file_paths if file_path[:3] != "gs:"]
+		self._validate_single_truncating_job(write_disposition, int(bool(gcs_uris)) + len(local_file_paths))
+
+		if gcs_uris:
+			load_job = self._service.load_table_from_uri(gcs_uris, table_id,
+			                                             job_config=bigquery.LoadJobConfig(**job_config_info))
+			load_job.result()
+			# The first job already applied the write disposition, the following ones must not truncate its rows
+			job_config_info["write_disposition"] = bigquery.WriteDisposition.WRITE_APPEND
+
+		for file_path in local_file_paths:
+			with open(file_path, "rb") as source_file:
+				load_job = self._service.load_table_from_file(source_file, table_id,
+				                                              job_config=bigquery.LoadJobConfig(**job_config_info))
+			load_job.result()
+			job_config_info["write_disposition"] = bigquery.WriteDisposition.WRITE_APPEND
+
+		self._table_metadata_cache.invalidate(table_id)
+
+	@instrumented("bigquery.load_csv_files")
+	def load_csv_files(self, table_id: str, csv_file_paths: list[str] | str, write_disposition: str = "WRITE_APPEND",
+	                   schema_dict: dict[str, str] = None, time_partition_type: str = None, partition_col: str = None,
+	                   staging_bucket_name: str = None, staging_prefix: str = "bigquery_staging",
+	                   max_workers: int = None) -> LoadJobReport:
+		"""Load many CSV files in as few load jobs as possible.
+
+		Paths may be local glob patterns or gs:// URIs (wildcards included). Local files are gzipped in a process pool
+		and, when a staging bucket is given, uploaded in parallel to GCS so that every file is loaded by a single atomic
+		job. Without a staging bucket each local file is its own job, so WRITE_TRUNCATE is refused for several files.
+		"""
+		if write_disposition not in self.__class__._WRITE_DISPOSITION:
+			raise ValueError(f"Write disposition must be either {', '.join(self.__class__._WRITE_DISPOSITION.keys())}")
+
+		if isinstance(csv_file_paths, str):
+			csv_file_paths = [csv_file_paths]
+
+		gcs_uris, local_file_paths = self._expand_csv_file_paths(csv_file_paths)
+		if staging_bucket_name:
+			self._validate_single_truncating_job(write_disposition, 1)
+		else:
+			self._validate_single_truncating_job(write_disposition, int(bool(gcs_uris)) + len(local_file_paths))
+		job_config_info = {
+			"source_format": bigquery.SourceFormat.CSV,
+			"allow_jagged_rows": True,
+			"allow_quoted_newlines": True,
+			"skip_leading_rows": 1,
+			"write_disposition": self.__class__._WRITE_DISPOSITION.get(write_disposition)
+		}
+
+		if schema_dict:
+			job_config_info["schema"] = self._create_schema_field_list_from_dict(schema_dict)
+		else:
+			job_config_info["autodetect"] = True
+
+		if time_partition_type:
+			job_config_info["time_partitioning"] = self._create_time_partitioning_info(time_partition_type,
+			                                                                           partition_col)
+
+		report = LoadJobReport(table_id=table_id, input_file_count=len(gcs_uris) + len(local_file_paths))
+		staged_blobs = []
+
+		with TemporaryDirectory() as temp_dir:
+			start_time = time.perf_counter()
+			compressed_file_paths = self._compress_files(local_file_paths, temp_dir, max_workers)
+			report.compress_seconds = time.perf_counter() - start_time
+
+			if compressed_file_paths and staging_bucket_name:
+				start_time = time.perf_counter()
+				staged_blobs = self._upload_files_to_staging_bucket(compressed_file_paths, staging_bucket_name,
+				                                                    staging_prefix, max_workers)
+				gcs_uris.extend(f"gs://{staging_bucket_name}/{blob.name}" for blob in staged_blobs)
+				compressed_file_paths = []
+				report.upload_seconds = time.perf_counter() - start_time
+
+			try:
+				start_time = time.perf_counter()
+				load_jobs = []
+				if gcs_uris:
+					load_job = self._service.load_table_from_uri(gcs_uris, table_id,
+					                                             job_config=bigquery.LoadJobConfig(**job_config_info))
+					load_job.result()
+					load_jobs.append(load_job)
+					job_config_info["write_disposition"] = bigquery.WriteDisposition.WRITE_APPEND
+
+				load_jobs.extend(
+					self._load_local_files_in_parallel(compressed_file_paths, table_id, job_config_info, max_workers))
+				report.load_seconds = time.perf_counter() - start_time
+			finally:
+				self._table_metadata_cache.invalidate(table_id)
+				if staged_blobs:
+					self._client.storage_service.bucket(staging_bucket_name).delete_blobs(staged_blobs)
+
+		report.source_uris = gcs_uris
+		for load_job in load_jobs:
+			report.job_ids.append(load_job.job_id)
+			report.input_bytes += load_job.input_file_bytes or 0
+			report.output_rows += load_job.output_rows or 0
+			if load_job.started and load_job.ended:
+				report.job_durations_seconds[load_job.job_id] = (load_job.ended - load_job.started).total_seconds()
+
+		return report
+
+	@instrumented("bigquery.upsert_dataframe")
+	def upsert_dataframe(self, table_id: str, df: pd.DataFrame, key_columns: list[str],
+	                     staging_dataset_name: str = None):
+		table_id = self.validate_table_id_exists(table_id)
+		table = self.get_table_by_id(table_id)
+		columns = list(df.columns)
+		self._validate_upsert_columns(table, columns, key_columns)
+
+		staging_table_id = self._create_staging_table(table, columns, staging_dataset_name)
+		try:
+			job_config_info = self._create_load_parquet_job_config_info("WRITE_APPEND")
+			load_job = self._create_load_dataframe_job(df=df, job_config_info=job_config_info,
+			                                           table_id=staging_table_id)
+			load_job.result()
+			self._merge_staging_table_into_table(staging_table_id, table, columns, key_columns)
+		finally:
+			self._service.delete_table(staging_table_id, not_found_ok=True)
+			self._table_metadata_cache.invalidate(table_id)
+
+	@instrumented("bigquery.upsert_from_csv_file")
+	def upsert_from_csv_file(self, table_id: str, csv_file_path: str, key_columns: list[str],
+	                         staging_dataset_name: str = None):
+		table_id = self.validate_table_id_exists(table_id)
+		table = self.get_table_by_id(table_id)
+		columns = [col_schema.name for col_schema in table.schema]
+		self._validate_upsert_columns(table, columns, key_columns)
 
+		staging_table_id = self._create_staging_table(table, columns, staging_dataset_name)
+		try:
+			job_config_info = {
+				"source_format": bigquery.SourceFormat.CSV,
+				"allow_jagged_rows": True,
+				"allow_quoted_newlines": True,
+				"skip_leading_rows": 1,
+				"write_disposition": bigquery.WriteDisposition.WRITE_APPEND
+			}
+			load_job = self._create_load_csv_job(csv_file_path_str=csv_file_path, job_config_info=job_config_info,
+			                                     table_id=staging_table_id)
+			load_job.result()
+			self._merge_staging_table_into_table(staging_table_id, table, columns, key_columns)
+		finally:
+			self._service.delete_table(staging_table_id, not_found_ok=True)
+			self._table_metadata_cache.invalidate(table_id)
+
+	@instrumented("bigquery.check_table_exists")
 	def check_table_exists(self, table_id: str) -> bool:
 		try:
 			self.get_table_by_id(table_id)
@@ -164,16 +428,20 @@ class BigqueryService:
 		except NotFound:
 			return False
 
+	@instrumented("bigquery.duplicate_table")
 	def duplicate_table(self, source_table_id: str, destination_table_id: str):
 		source_table_id = self.validate_table_id_exists(source_table_id)
 		destination_table_id = self.validate_table_id_does_not_exist(destination_table_id)
 
 		job = self._service.copy_table(source_table_id, destination_table_id)
 		job.result()
+		self._table_metadata_cache.invalidate(destination_table_id)
 
+	@instrumented("bigquery.delete_table")
 	def delete_table(self, table_id: str):
 		table_id = self.validate_table_id_exists(table_id)
 		self._service.delete_table(table_id)
+		self._table_metadata_cache.invalidate(table_id)
 
 	@staticmethod
 	def split_table_id(table_id: str) -> tuple[str, str, str]:
@@ -192,6 +460,55 @@ class BigqueryService:
 	def _get_table_ref(self, project_id: str, dataset_name: str, table_name: str):
 		return self._get_dataset_ref(project_id=project_id, dataset_name=dataset_name).table(table_id=table_name)
 
+	def _invalidate_job_destination(self, job):
+		# DML and DDL statements do not expose every table they change, so they drop the whole metadata cache
+		if isinstance(job, bigquery.QueryJob) and job.statement_type not in (None, "SELECT"):
+			self._table_metadata_cache.clear()
+			return
+
+		destination = getattr(job, "destination", None)
+		if destination is not None:
+			self._table_metadata_cache.invalidate(
+				self._construct_table_id(destination.project, destination.dataset_id, destination.table_id))
+
+	def _run_query_into_pandas(self, query_str: str) -> pd.DataFrame:
+		query_job = self._service.query(query_str)
+
+		return query_job.result().to_dataframe()
+
+	@staticmethod
+	def _validate_single_truncating_job(write_disposition: str, job_count: int):
+		# A truncating job followed by appending ones would leave a truncated table with partial data if one of them
+		# failed
+		if write_disposition == "WRITE_TRUNCATE" and job_count > 1:
+			raise ValueError("WRITE_TRUNCATE needs a single load job, load the files through GCS (a staging bucket or "
+			                 "gs:// URIs) to truncate the table")
+
+	def _get_query_cache_key(self, query_str: str) -> Optional[str]:
+		if not BigqueryQueryCache.check_query_is_deterministic(query_str):
+			return None
+
+		dry_run_job = self._service.query(query_str,
+		                                  job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False))
+		# Only plain SELECT statements are cached, serving DML, DDL or scripts from the cache would skip running them.
+		# Queries without source tables cannot be checked for freshness, and the dry run truncates the list of
+		# referenced tables at 50 so the freshness of larger queries cannot be checked either
+		if dry_run_job.statement_type != "SELECT" or not dry_run_job.referenced_tables or \
+				len(dry_run_job.referenced_tables) >= self.__class__._MAX_REFERENCED_TABLES:
+			return None
+
+		table_modified_dict = dict()
+		for table_ref in dry_run_job.referenced_tables:
+			table = self._service.get_table(table_ref)
+			# Streaming inserts and external data change the results without always updating the modified time
+			if table.streaming_buffer or table.table_type == "EXTERNAL":
+				return None
+
+			table_modified_dict[self._construct_table_id(table.project, table.dataset_id, table.table_id)] = \
+				table.modified
+
+		return BigqueryQueryCache.create_cache_key(query_str, table_modified_dict)
+
 	@staticmethod
 	def _construct_table_id(project_id: str, dataset_name: str, table_name: str) -> str:
 		return f"{project_id}.{dataset_name}.{table_name}"
@@ -204,6 +521,55 @@ class BigqueryService:
 
 		return schema_info_list
 
+	@classmethod
+	def _create_schema_field_list_from_arrow_schema(cls, arrow_schema: pa.Schema) -> list[bigquery.SchemaField]:
+		return [cls._create_schema_field_from_arrow_field(arrow_field) for arrow_field in arrow_schema]
+
+	@classmethod
+	def _create_schema_field_from_arrow_field(cls, arrow_field: pa.Field) -> bigquery.SchemaField:
+		import pyarrow as pa
+
+		arrow_type = arrow_field.type
+		if pa.types.is_dictionary(arrow_type):
+			arrow_type = arrow_type.value_type
+
+		if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+			value_field = cls._create_schema_field_from_arrow_field(arrow_type.value_field)
+			return bigquery.SchemaField(name=arrow_field.name, field_type=value_field.field_type, mode="REPEATED",
+			                            fields=value_field.fields)
+
+		if pa.types.is_struct(arrow_type):
+			return bigquery.SchemaField(name=arrow_field.name, field_type="RECORD",
+			                            fields=[cls._create_schema_field_from_arrow_field(arrow_type.field(i))
+			                                    for i in range(arrow_type.num_fields)])
+
+		return bigquery.SchemaField(name=arrow_field.name, field_type=cls._get_bigquery_type_from_arrow_type(arrow_type))
+
+	@staticmethod
+	def _get_bigquery_type_from_arrow_type(arrow_type: pa.DataType) -> str:
+		import pyarrow as pa
+
+		if pa.types.is_boolean(arrow_type):
+			return "BOOLEAN"
+		if pa.types.is_integer(arrow_type):
+			return "INTEGER"
+		if pa.types.is_floating(arrow_type):
+			return "FLOAT"
+		if pa.types.is_decimal(arrow_type):
+			return "NUMERIC" if arrow_type.precision <= 38 else "BIGNUMERIC"
+		if pa.types.is_timestamp(arrow_type):
+			return "TIMESTAMP" if arrow_type.tz else "DATETIME"
+		if pa.types.is_date(arrow_type):
+			return "DATE"
+		if pa.types.is_time(arrow_type):
+			return "TIME"
+		if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type):
+			return "BYTES"
+		if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) or pa.types.is_null(arrow_type):
+			return "STRING"
+
+		raise ValueError(f"Arrow type {arrow_type} is not supported by BigQuery")
+
 	def _create_time_partitioning_info(self, time_partition_type: str, partition_col: str = None):
 		if time_partition_type not in self.__class__._TIME_PARTITIONING_TYPE:
 			raise ValueError(
@@ -225,3 +591,209 @@ class BigqueryService:
 				                                              job_config=bigquery.LoadJobConfig(**job_config_info))
 
 		return load_job
+
+	@staticmethod
+	def _expand_csv_file_paths(csv_file_paths: list[str]) -> tuple[list[str], list[str]]:
+		gcs_uris: list[str] = []
+		local_file_paths: list[str] = []
+
+		for csv_file_path in csv_file_paths:
+			if csv_file_path[:3] == "gs:":
+				gcs_uris.append(csv_file_path)
+				continue
+
+			matched_file_paths = sorted(glob.glob(csv_file_path))
+			if not matched_file_paths:
+				raise FileNotFoundError(f"No file matches {csv_file_path}")
+			local_file_paths.extend(matched_file_paths)
+
+		return gcs_uris, local_file_paths
+
+	@classmethod
+	def _compress_files(cls, file_paths: list[str], output_dir: str, max_workers: int = None) -> list[str]:
+		files_to_compress = [file_path for file_path in file_paths if not file_path.endswith(".gz")]
+		if not files_to_compress:
+			return list(file_paths)
+
+		output_paths = [Path(output_dir, f"{index}_{Path(file_path).name}.gz").as_posix()
+		                for index, file_path in enumerate(files_to_compress)]
+		with ProcessPoolExecutor(max_workers=max_workers) as executor:
+			list(executor.map(cls._gzip_file, files_to_compress, output_paths))
+
+		return [file_path for file_path in file_paths if file_path.endswith(".gz")] + output_paths
+
+	@staticmethod
+	def _gzip_file(file_path: str, output_path: str) -> str:
+		with open(file_path, "rb") as source_file, gzip.open(output_path, "wb", compresslevel=6) as target_file:
+			shutil.copyfileobj(source_file, target_file, 1024 * 1024)
+
+		return output_path
+
+	def _upload_files_to_staging_bucket(self, file_paths: list[str], bucket_name: str, prefix: str,
+	                                    max_workers: int = None) -> list:
+		bucket = self._client.storage_service.bucket(bucket_name)
+		# Concurrent loads must never share a prefix, the staged blobs are deleted once the load is over
+		prefix = f"{prefix.rstrip('/')}/{time.strftime('%Y%m%d%H%M%S')}_{uuid4().hex}/"
+
+		def __upload(index: int, file_path: str):
+			blob = bucket.blob(f"{prefix}{index}_{Path(file_path).name}")
+			blob.upload_from_filename(file_path, content_type="application/gzip")
+			return blob
+
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			return map_in_context(executor, __upload, range(len(file_paths)), file_paths)
+
+	def _load_local_files_in_parallel(self, file_paths: list[str], table_id: str, job_config_info: dict,
+	                                  max_workers: int = None) -> list:
+		if not file_paths:
+			return []
+
+		def __load(file_path: str, config_info: dict):
+			load_job = self._create_load_csv_job(csv_file_path_str=file_path, job_config_info=config_info,
+			                                     table_id=table_id)
+			load_job.result()
+			return load_job
+
+		# The first file applies the write disposition, the remaining ones can only be appended next to it
+		load_jobs = [__load(file_paths[0], job_config_info)]
+		append_config_info = {**job_config_info, "write_disposition": bigquery.WriteDisposition.WRITE_APPEND}
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			load_jobs.extend(map_in_context(executor, lambda file_path: __load(file_path, append_config_info),
+			                                file_paths[1:]))
+
+		return load_jobs
+
+	@staticmethod
+	def _validate_upsert_columns(table: Table, columns: list[str], key_columns: list[str]):
+		if not key_columns:
+			raise ValueError("At least one key column must be provided")
+
+		table_columns = [col_schema.name for col_schema in table.schema]
+		unknown_columns = [col for col in columns if col not in table_columns]
+		if unknown_columns:
+			raise ValueError(f"Columns {', '.join(unknown_columns)} do not exist in table {table.table_id}")
+
+		missing_key_columns = [col for col in key_columns if col not in columns]
+		if missing_key_columns:
+			raise ValueError(f"Key columns {', '.join(missing_key_columns)} are missing from the upserted data")
+
+	def _create_staging_table(self, table: Table, columns: list[str], staging_dataset_name: str = None) -> str:
+		staging_table_id = self._construct_table_id(table.project, staging_dataset_name or table.dataset_id,
+		                                            f"{table.table_id}_staging_{uuid4().hex[:8]}")
+		staging_table = bigquery.Table(staging_table_id,
+		                               schema=[col_schema for col_schema in table.schema if col_schema.name in columns])
+		# Expiration is only a safety net in case the staging table cannot be dropped
+		staging_table.expires = datetime.datetime.now(datetime.timezone.utc) + \
+		                        self.__class__._STAGING_TABLE_EXPIRATION
+		self._service.create_table(staging_table)
+
+		return staging_table_id
+
+	def _merge_staging_table_into_table(self, staging_table_id: str, table: Table, columns: list[str],
+	                                    key_columns: list[str]):
+		table_id = self._construct_table_id(table.project, table.dataset_id, table.table_id)
+		partition_col = self._get_partition_col(table)
+		query_parameters: list[bigquery.ScalarQueryParameter] = []
+		partition_filter = None
+
+		# A key always stays in the same partition only when the partition column is part of the key. Otherwise an
+		# upserted row may have moved out of the staged range (e.g. partitioned on updated_at, keyed on id), and
+		# filtering on that range would insert it a second time instead of updating it
+		if partition_col in key_columns:
+			stats = list(self._service.query(
+				f"SELECT COUNT(*) AS row_count, COUNT(`{partition_col}`) AS partition_value_count, "
+				f"MIN(`{partition_col}`) AS min_value, MAX(`{partition_col}`) AS max_value "
+				f"FROM `{staging_table_id}`"
+			).result())[0]
+			if stats.row_count == 0:
+				return
+
+			# Rows with a NULL partition value belong to the __NULL__ partition, which a range cannot select
+			if stats.partition_value_count == stats.row_count:
+				partition_type = [col_schema.field_type for col_schema in table.schema if
+				                  col_schema.name == partition_col][0]
+				query_parameters = [
+					bigquery.ScalarQueryParameter("partition_min_value", partition_type, stats.min_value),
+					bigquery.ScalarQueryParameter("partition_max_value", partition_type, stats.max_value)
+				]
+				partition_filter = f"T.`{partition_col}` BETWEEN @partition_min_value AND @partition_max_value"
+
+		merge_query = self._create_merge_query(table_id, staging_table_id, columns, key_columns, partition_filter)
+		query_job = self._service.query(merge_query,
+		                                job_config=bigquery.QueryJobConfig(query_parameters=query_parameters))
+		query_job.result()
+
+	@staticmethod
+	def _get_partition_col(table: Table) -> Optional[str]:
+		if table.time_partitioning and table.time_partitioning.field:
+			return table.time_partitioning.field
+		if table.range_partitioning:
+			return table.range_partitioning.field
+
+		return None
+
+	@staticmethod
+	def _create_merge_query(table_id: str, staging_table_id: str, columns: list[str], key_columns: list[str],
+	                        partition_filter: str = None) -> str:
+		on_conditions = [f"T.`{col}` = S.`{col}`" for col in key_columns]
+		if partition_filter:
+			# Every staged row lies inside the filtered range, so matching rows can only live in those partitions
+			on_conditions.append(partition_filter)
+
+		update_columns = [col for col in columns if col not in key_columns]
+		insert_columns = ", ".join(f"`{col}`" for col in columns)
+		insert_values = ", ".join(f"S.`{col}`" for col in columns)
+
+		merge_query = f"MERGE `{table_id}` T\nUSING `{staging_table_id}` S\nON {' AND '.join(on_conditions)}\n"
+		if update_columns:
+			merge_query += f"WHEN MATCHED THEN UPDATE SET {', '.join(f'`{col}` = S.`{col}`' for col in update_columns)}\n"
+		merge_query += f"WHEN NOT MATCHED THEN INSERT ({insert_columns}) VALUES ({insert_values})"
+
+		return merge_query
+
+	def _create_load_parquet_job_config_info(self, write_disposition: str, time_partition_type: str = None,
+	                                         partition_col: str = None) -> dict:
+		if write_disposition not in self.__class__._WRITE_DISPOSITION:
+			raise ValueError(f"Write disposition must be either {', '.join(self.__class__._WRITE_DISPOSITION.keys())}")
+
+		# pyarrow writes lists as the 3-level list<element> structure, without list inference BigQuery reads them as
+		# RECORD columns instead of the REPEATED fields of the schema
+		parquet_options = bigquery.ParquetOptions()
+		parquet_options.enable_list_inference = True
+
+		job_config_info = {
+			"source_format": bigquery.SourceFormat.PARQUET,
+			"write_disposition": self.__class__._WRITE_DISPOSITION.get(write_disposition),
+			"parquet_options": parquet_options
+		}
+
+		if time_partition_type:
+			job_config_info["time_partitioning"] = self._create_time_partitioning_info(time_partition_type,
+			                                                                           partition_col)
+
+		return job_config_info
+
+	def _create_load_dataframe_job(self, df: pd.DataFrame, job_config_info: dict, table_id: str,
+	                               compression: str = "SNAPPY", chunk_size: int = None,
+	                               arrow_schema: pa.Schema = None):
+		import pyarrow as pa
+		import pyarrow.parquet as pq
+
+		if compression.upper() not in self.__class__._PARQUET_COMPRESSION:
+			raise ValueError(f"Compression must be either {', '.join(self.__class__._PARQUET_COMPRESSION)}")
+
+		arrow_schema = arrow_schema or pa.Schema.from_pandas(df, preserve_index=False)
+		chunk_size = chunk_size or max(len(df), 1)
+
+		with SpooledTemporaryFile(max_size=self.__class__._PARQUET_SPOOL_MAX_SIZE) as parquet_file:
+			# Each chunk becomes one row group, so the whole frame never has to be converted to Arrow at once
+			with pq.ParquetWriter(parquet_file, arrow_schema, compression=compression) as writer:
+				for start in range(0, len(df), chunk_size):
+					writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_size], schema=arrow_schema,
+					                                        preserve_index=False))
+
+			parquet_file.seek(0)
+			load_job = self._service.load_table_from_file(parquet_file, table_id,
+			                                              job_config=bigquery.LoadJobConfig(**job_config_info))
+
+		return load_job
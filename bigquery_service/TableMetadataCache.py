@@ -0,0 +1,57 @@
+import threading
+import time
+from typing import Optional
+
+from google.cloud.bigquery.table import Table
+
+
+class TableMetadataCache:
+	def __init__(self, ttl_seconds: float = 60):
+		self._ttl_seconds = ttl_seconds
+		self._tables: dict[str, tuple[Table, float]] = dict()
+		self._lock = threading.Lock()
+		self._hits = 0
+		self._misses = 0
+
+	@property
+	def hits(self) -> int:
+		return self._hits
+
+	@property
+	def misses(self) -> int:
+		return self._misses
+
+	def get(self, table_id: str) -> Optional[Table]:
+		table_id = self._normalize_table_id(table_id)
+
+		with self._lock:
+			cached_table = self._tables.get(table_id)
+			if cached_table is None or cached_table[1] <= time.monotonic():
+				self._tables.pop(table_id, None)
+				self._misses += 1
+				return None
+
+			self._hits += 1
+			return cached_table[0]
+
+	def put(self, table_id: str, table: Table):
+		if self._ttl_seconds <= 0:
+			return
+
+		with self._lock:
+			self._tables[self._normalize_table_id(table_id)] = (table, time.monotonic() + self._ttl_seconds)
+
+	def invalidate(self, table_id: str):
+		with self._lock:
+			self._tables.pop(self._normalize_table_id(table_id), None)
+
+	def clear(self):
+		with self._lock:
+			self._tables.clear()
+
+	def get_stats(self) -> dict[str, int]:
+		return {"hits": self._hits, "misses": self._misses, "size": len(self._tables)}
+
+	@staticmethod
+	def _normalize_table_id(table_id: str) -> str:
+		return table_id.replace(":", ".").strip("`")
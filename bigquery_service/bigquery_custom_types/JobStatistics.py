@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class JobStatistics(BaseModel):
+	name: str
+	state: str
+	job_id: Optional[str] = None
+	job_type: Optional[str] = None
+	created: Optional[datetime] = None
+	started: Optional[datetime] = None
+	ended: Optional[datetime] = None
+	duration_seconds: Optional[float] = None
+	total_bytes_processed: Optional[int] = None
+	total_bytes_billed: Optional[int] = None
+	slot_millis: Optional[int] = None
+	error: Optional[str] = None
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class LoadJobReport(BaseModel):
+	table_id: str
+	source_uris: list[str] = []
+	job_ids: list[str] = []
+	input_file_count: int = 0
+	input_bytes: int = 0
+	output_rows: int = 0
+	compress_seconds: float = 0
+	upload_seconds: float = 0
+	load_seconds: float = 0
+	job_durations_seconds: dict[str, float] = {}
@@ -0,0 +1,101 @@
+import asyncio
+import io
+from pathlib import Path
+from typing import AsyncIterator
+from urllib.parse import quote
+
+import httpx
+
+from google_common.AsyncGoogleHttpClient import AsyncGoogleHttpClient
+from google_common.Instrumentation import Instrumentation, instrumented
+
+from .GcsClient import GcsClient
+from .GcsService import GcsService
+
+
+class AsyncGcsService:
+	"""Async counterpart of GcsService, with the same methods."""
+	_BASE_URL = "https://storage.googleapis.com/storage/v1/b"
+	_UPLOAD_URL = "https://storage.googleapis.com/upload/storage/v1/b"
+
+	def __init__(self, client: GcsClient, bucket_name: str, max_concurrency: int = 10,
+	             instrumentation: Instrumentation = None):
+		self._http = AsyncGoogleHttpClient(client.credentials, max_concurrency=max_concurrency)
+		self._bucket_name = bucket_name
+		self._instrumentation = instrumentation
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.aclose()
+
+	async def aclose(self):
+		await self._http.aclose()
+
+	@instrumented("gcs_async.iter_blobs")
+	async def iter_blobs(self, prefix: str = None) -> AsyncIterator[dict]:
+		params = {"fields": "nextPageToken, items(name, size, updated)"}
+		if prefix:
+			params["prefix"] = prefix
+
+		async for page in self._http.iter_pages(f"{self.__class__._BASE_URL}/{self._bucket_name}/o", params=params):
+			for blob in page.get("items", []):
+				yield blob
+
+	@instrumented("gcs_async.get_direct_children_folders")
+	async def get_direct_children_folders(self, prefix: str) -> list[str]:
+		prefix = GcsService._add_slash_to_prefix(prefix)
+		blob_names = [blob["name"] async for blob in self.iter_blobs(prefix=prefix)]
+
+		return GcsService._filter_direct_children_folders(blob_names, prefix)
+
+	@instrumented("gcs_async.get_direct_children_files")
+	async def get_direct_children_files(self, prefix: str) -> list[str]:
+		prefix = GcsService._add_slash_to_prefix(prefix)
+		blob_names = [blob["name"] async for blob in self.iter_blobs(prefix=prefix)]
+
+		return GcsService._filter_direct_children_files(blob_names, prefix)
+
+	@instrumented("gcs_async.upload_file")
+	async def upload_file(self, file_path: Path, prefix: str) -> str:
+		prefix = GcsService._add_slash_to_prefix(prefix)
+
+		blob_name = prefix + file_path.name
+		await self._http.request("POST", f"{self.__class__._UPLOAD_URL}/{self._bucket_name}/o",
+		                         params={"uploadType": "media", "name": blob_name}, file_path=file_path)
+
+		return blob_name
+
+	@instrumented("gcs_async.create_folder_if_not_exists")
+	async def create_folder_if_not_exists(self, prefix: str, folder_name: str) -> str:
+		prefix = GcsService._add_slash_to_prefix(prefix)
+
+		blob_name = prefix + folder_name + "/"
+		try:
+			await self._http.request("GET", self._get_blob_url(blob_name))
+		except httpx.HTTPStatusError as e:
+			if e.response.status_code != 404:
+				raise
+			await self._http.request("POST", f"{self.__class__._UPLOAD_URL}/{self._bucket_name}/o",
+			                         params={"uploadType": "media", "name": blob_name}, content=b"")
+
+		return blob_name
+
+	@instrumented("gcs_async.download_blob")
+	async def download_blob(self, blob_name: str, file_path: Path) -> Path:
+		return await self._http.download_to_file(self._get_blob_url(blob_name), file_path, params={"alt": "media"})
+
+	@instrumented("gcs_async.read_blob")
+	async def read_blob(self, blob_name: str) -> io.BytesIO:
+		response = await self._http.request("GET", self._get_blob_url(blob_name), params={"alt": "media"})
+
+		return io.BytesIO(response.content)
+
+	@instrumented("gcs_async.delete_blob")
+	async def delete_blob(self, blob_name: str):
+		blob_names = [blob["name"] async for blob in self.iter_blobs(prefix=blob_name)]
+		await asyncio.gather(*(self._http.request("DELETE", self._get_blob_url(name)) for name in blob_names))
+
+	def _get_blob_url(self, blob_name: str) -> str:
+		return f"{self.__class__._BASE_URL}/{self._bucket_name}/o/{quote(blob_name, safe='')}"
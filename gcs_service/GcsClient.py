@@ -1,12 +1,23 @@
-from google.cloud import storage
 from functools import cached_property
 from pathlib import Path
 
+from google_common.GoogleClientFactory import GoogleClientFactory
+
 
 class GcsClient:
-	def __init__(self, sa_file_path: Path):
+	_SCOPES = ["https://www.googleapis.com/auth/devstorage.full_control"]
+
+	def __init__(self, sa_file_path: Path, client_factory: GoogleClientFactory = None):
 		self._sa_file_path = sa_file_path
+		self._client_factory = client_factory or GoogleClientFactory.default()
+
+	@cached_property
+	def credentials(self):
+		return self._client_factory.get_service_account_credentials(self._sa_file_path, scopes=self.__class__._SCOPES)
 
 	@cached_property
 	def service(self):
-		return storage.Client.from_service_account_json(self._sa_file_path.as_posix())
+		from google.cloud import storage
+
+		return storage.Client(project=self.credentials.project_id, credentials=self.credentials,
+		                      _http=self._client_factory.get_authorized_session(self.credentials))
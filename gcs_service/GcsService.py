@@ -1,37 +1,32 @@
 from pathlib import Path
 import io
 
+from google_common.Instrumentation import Instrumentation, instrumented, iter_page_items
+
 from .GcsClient import GcsClient
 
 
 class GcsService:
-	def __init__(self, client: GcsClient, bucket_name: str):
+	def __init__(self, client: GcsClient, bucket_name: str, instrumentation: Instrumentation = None):
 		self._service = client.service
 		self._bucket = self._service.bucket(bucket_name=bucket_name)
+		self._instrumentation = instrumentation
 
+	@instrumented("gcs.get_direct_children_folders")
 	def get_direct_children_folders(self, prefix: str) -> list[str]:
 		prefix = self._add_slash_to_prefix(prefix)
-		blobs = self._service.list_blobs(self._bucket, prefix=prefix)
+		blobs = iter_page_items(self._service.list_blobs(self._bucket, prefix=prefix))
 
-		direct_children_folders: list[str] = []
-		for blob in blobs:
-			if blob.name != prefix and blob.name.endswith("/") and len(blob.name.split("/")) == len(
-					prefix.split("/")) + 1:
-				direct_children_folders.append(blob.name.split("/")[-2])
-
-		return direct_children_folders
+		return self._filter_direct_children_folders([blob.name for blob in blobs], prefix)
 
+	@instrumented("gcs.get_direct_children_files")
 	def get_direct_children_files(self, prefix: str) -> list[str]:
 		prefix = self._add_slash_to_prefix(prefix)
-		blobs = self._service.list_blobs(self._bucket, prefix=prefix)
+		blobs = iter_page_items(self._service.list_blobs(self._bucket, prefix=prefix))
 
-		direct_children_files: list[str] = []
-		for blob in blobs:
-			if not blob.name.endswith("/") and len(blob.name.split("/")) == len(prefix.split("/")):
-				direct_children_files.append(blob.name.split("/")[-1])
-
-		return direct_children_files
+		return self._filter_direct_children_files([blob.name for blob in blobs], prefix)
 
+	@instrumented("gcs.upload_file")
 	def upload_file(self, file_path: Path, prefix: str) -> str:
 		prefix = self._add_slash_to_prefix(prefix)
 
@@ -41,6 +36,7 @@ class GcsService:
 
 		return blob_name
 
+	@instrumented("gcs.create_folder_if_not_exists")
 	def create_folder_if_not_exists(self, prefix: str, folder_name: str) -> str:
 		prefix = self._add_slash_to_prefix(prefix)
 
@@ -51,21 +47,43 @@ class GcsService:
 
 		return blob_name
 
+	@instrumented("gcs.download_blob")
 	def download_blob(self, blob_name: str, file_path: Path) -> Path:
 		blob = self._bucket.blob(blob_name)
 		blob.download_to_filename(file_path)
 
 		return file_path
 
+	@instrumented("gcs.read_blob")
 	def read_blob(self, blob_name: str) -> io.BytesIO:
 		blob = self._bucket.blob(blob_name)
 
 		return io.BytesIO(blob.download_as_bytes())
 
+	@instrumented("gcs.delete_blob")
 	def delete_blob(self, blob_name: str):
-		blobs = list(self._bucket.list_blobs(prefix=blob_name))
+		blobs = list(iter_page_items(self._bucket.list_blobs(prefix=blob_name)))
 		self._bucket.delete_blobs(blobs)
 
+	@staticmethod
+	def _filter_direct_children_folders(blob_names: list[str], prefix: str) -> list[str]:
+		direct_children_folders: list[str] = []
+		for blob_name in blob_names:
+			if blob_name != prefix and blob_name.endswith("/") and len(blob_name.split("/")) == len(
+					prefix.split("/")) + 1:
+				direct_children_folders.append(blob_name.split("/")[-2])
+
+		return direct_children_folders
+
+	@staticmethod
+	def _filter_direct_children_files(blob_names: list[str], prefix: str) -> list[str]:
+		direct_children_files: list[str] = []
+		for blob_name in blob_names:
+			if not blob_name.endswith("/") and len(blob_name.split("/")) == len(prefix.split("/")):
+				direct_children_files.append(blob_name.split("/")[-1])
+
+		return direct_children_files
+
 	@staticmethod
 	def _add_slash_to_prefix(prefix: str) -> str:
 		if not prefix.endswith("/"):
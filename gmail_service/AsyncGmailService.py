@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from base64 import urlsafe_b64decode
+from pathlib import Path
+from typing import AsyncIterator, Optional, TYPE_CHECKING
+from io import BytesIO
+
+from google_common.AsyncGoogleHttpClient import AsyncGoogleHttpClient
+from google_common.Instrumentation import Instrumentation, instrumented
+
+from .GmailClient import GmailClient
+from .GmailService import GmailService
+
+if TYPE_CHECKING:
+	import pandas as pd
+
+	from .gmail_custom_types.GmailMessage import GmailMessage
+	from .gmail_custom_types.GmailThread import GmailThread
+	from .gmail_custom_types.AttachmentIdNamePair import AttachmentIdNamePair
+
+
+class AsyncGmailService:
+	"""Async counterpart of GmailService, with the same methods."""
+	_BASE_URL = "https://gmail.googleapis.com/gmail/v1/users/me"
+
+	def __init__(self, client: GmailClient, max_concurrency: int = 10, instrumentation: Instrumentation = None):
+		self._http = AsyncGoogleHttpClient(client.credentials, max_concurrency=max_concurrency)
+		self._instrumentation = instrumentation
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.aclose()
+
+	async def aclose(self):
+		await self._http.aclose()
+
+	@instrumented("gmail_async.send_email_message")
+	async def send_email_message(self, from_email, destination_list, subject, body, body_type: str = "plain",
+	                             attachments: list = None,
+	                             thread_id: str = None, cc_list: list[str] = None, bcc_list: list[str] = None):
+		message = await asyncio.to_thread(GmailService._build_message, from_email, destination_list, subject, body,
+		                                  body_type, attachments, thread_id, cc_list, bcc_list)
+
+		return await self._http.request_json("POST", f"{self.__class__._BASE_URL}/messages/send", json=message)
+
+	@instrumented("gmail_async.iter_messages_by_query")
+	async def iter_messages_by_query(self, query: str) -> AsyncIterator[GmailMessage]:
+		"""Follow the link: https://support.google.com/mail/answer/7190 to get more information about querying emails"""
+		async for page in self._http.iter_pages(f"{self.__class__._BASE_URL}/messages", params={"q": query}):
+			messages = await asyncio.gather(
+				*(self.get_message_by_id(message["id"]) for message in page.get("messages", [])))
+
+			for message in messages:
+				if message:
+					yield message
+
+	@instrumented("gmail_async.search_messages_by_query")
+	async def search_messages_by_query(self, query: str) -> list[GmailMessage]:
+		return [message async for message in self.iter_messages_by_query(query)]
+
+	@instrumented("gmail_async.get_thread_by_id")
+	async def get_thread_by_id(self, thread_id: str) -> GmailThread:
+		from pydantic import ValidationError
+		from .gmail_custom_types.GmailThread import GmailThread
+
+		result = await self._http.request_json("GET", f"{self.__class__._BASE_URL}/threads/{thread_id}")
+
+		try:
+			return GmailThread.parse_obj(result)
+		except ValidationError:
+			raise FileExistsError(f"Thread with id {thread_id} does not exist")
+
+	@instrumented("gmail_async.get_message_by_id")
+	async def get_message_by_id(self, message_id: str) -> Optional[GmailMessage]:
+		from pydantic import ValidationError
+		from .gmail_custom_types.GmailMessage import GmailMessage
+
+		result = await self._http.request_json("GET", f"{self.__class__._BASE_URL}/messages/{message_id}")
+
+		try:
+			return GmailMessage.parse_obj(result)
+		except ValidationError:
+			return None
+
+	@instrumented("gmail_async.download_attachments")
+	async def download_attachments(
+			self,
+			attachment_list: list[AttachmentIdNamePair],
+			parent_folder: Path = Path("."),
+			rename_mapping_dict: dict[str, str] = None
+	) -> list[Path]:
+		async def __download(attachment_pair: AttachmentIdNamePair) -> Optional[Path]:
+			data = await self._get_data_from_attachment_pair(attachment_pair)
+			if not data:
+				return None
+
+			file_name = (rename_mapping_dict or {}).get(attachment_pair.attachment_file_name,
+			                                            attachment_pair.attachment_file_name)
+			attachment_path: Path = parent_folder / file_name
+			await asyncio.to_thread(attachment_path.write_bytes, urlsafe_b64decode(data))
+
+			return attachment_path.resolve()
+
+		attachment_paths = await asyncio.gather(*(__download(attachment_pair) for attachment_pair in attachment_list))
+
+		return [attachment_path for attachment_path in attachment_paths if attachment_path]
+
+	@instrumented("gmail_async.read_csv_attachment_to_pandas")
+	async def read_csv_attachment_to_pandas(self, attachment_pair: AttachmentIdNamePair) -> pd.DataFrame:
+		import pandas as pd
+
+		assert attachment_pair.attachment_file_name.split(".")[-1] == "csv"
+
+		data: str = await self._get_data_from_attachment_pair(attachment_pair)
+
+		return pd.read_csv(BytesIO(base64.urlsafe_b64decode(data.encode("UTF-8"))))
+
+	@instrumented("gmail_async.read_excel_attachment_to_pandas")
+	async def read_excel_attachment_to_pandas(self, attachment_pair: AttachmentIdNamePair, password: str = None,
+	                                          sheet_name: str | list = None) -> pd.DataFrame:
+		assert attachment_pair.attachment_file_name.split(".")[-1] == "xlsx"
+
+		data: str = await self._get_data_from_attachment_pair(attachment_pair)
+
+		# Decrypting and parsing a workbook is CPU bound, so it runs outside the event loop
+		return await asyncio.to_thread(GmailService._read_excel_data_to_pandas, data, password, sheet_name)
+
+	async def _get_data_from_attachment_pair(self, attachment_pair: AttachmentIdNamePair) -> str:
+		attachment = await self._http.request_json(
+			"GET",
+			f"{self.__class__._BASE_URL}/messages/{attachment_pair.messageId}/attachments/{attachment_pair.attachmentId}"
+		)
+
+		return attachment.get("data")
+
+	query_attachments_from_email_message = staticmethod(GmailService.query_attachments_from_email_message)
+	convert_unix_timestamp_to_datetime = staticmethod(GmailService.convert_unix_timestamp_to_datetime)
@@ -3,32 +3,31 @@ from __future__ import annotations
 import base64
 import os
 from base64 import urlsafe_b64decode, urlsafe_b64encode
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
-from email.mime.audio import MIMEAudio
-from email.mime.base import MIMEBase
-from mimetypes import guess_type as guess_mime_type
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from io import BytesIO
-from loguru import logger
-from pydantic import ValidationError
 
-import msoffcrypto
-import pandas as pd
+from google_common.Instrumentation import Instrumentation, instrumented, record_page
 
 from .GmailClient import GmailClient
-from .gmail_custom_types.GmailMessage import GmailMessage
-from .gmail_custom_types.GmailThread import GmailThread
-from .gmail_custom_types.AttachmentIdNamePair import AttachmentIdNamePair
+
+# pandas, msoffcrypto, loguru, pydantic and the MIME modules are imported by the methods that need them, so that a
+# worker which only sends mails does not pay for them at import time
+if TYPE_CHECKING:
+	import pandas as pd
+
+	from .gmail_custom_types.GmailMessage import GmailMessage
+	from .gmail_custom_types.GmailThread import GmailThread
+	from .gmail_custom_types.AttachmentIdNamePair import AttachmentIdNamePair
 
 
 class GmailService:
-	def __init__(self, client: GmailClient):
+	def __init__(self, client: GmailClient, instrumentation: Instrumentation = None):
 		self._service = client.service
+		self._instrumentation = instrumentation
 
+	@instrumented("gmail.send_email_message")
 	def send_email_message(self, from_email, destination_list, subject, body, body_type: str = "plain",
 	                       attachments: list = None,
 	                       thread_id: str = None, cc_list: list[str] = None, bcc_list: list[str] = None):
@@ -38,21 +37,28 @@ class GmailService:
 			                         cc_list, bcc_list)
 		).execute()
 
+	@instrumented("gmail.search_messages_by_query")
 	def search_messages_by_query(self, query: str) -> list[GmailMessage]:
 		"""Follow the link: https://support.google.com/mail/answer/7190 to get more information about querying emails"""
 		result = self._service.users().messages().list(userId="me", q=query).execute()
+		record_page()
 
 		messages = self._parse_messages_dict(result)
 
 		while "nextPageToken" in result:
 			page_token = result["nextPageToken"]
 			result = self._service.users().messages().list(userId="me", q=query, pageToken=page_token).execute()
+			record_page()
 
 			messages.extend(self._parse_messages_dict(result))
 
 		return messages
 
+	@instrumented("gmail.get_thread_by_id")
 	def get_thread_by_id(self, thread_id: str) -> GmailThread:
+		from pydantic import ValidationError
+		from .gmail_custom_types.GmailThread import GmailThread
+
 		result = self._service.users().threads().get(userId="me", id=thread_id).execute()
 
 		try:
@@ -60,7 +66,11 @@ class GmailService:
 		except ValidationError:
 			raise FileExistsError(f"Thread with id {thread_id} does not exist")
 
+	@instrumented("gmail.get_message_by_id")
 	def get_message_by_id(self, message_id: str) -> Optional[GmailMessage]:
+		from pydantic import ValidationError
+		from .gmail_custom_types.GmailMessage import GmailMessage
+
 		result = self._service.users().messages().get(userId="me", id=message_id).execute()
 
 		try:
@@ -71,6 +81,8 @@ class GmailService:
 	@staticmethod
 	def query_attachments_from_email_message(message: GmailMessage, attachment_name_filter: list[str] = None,
 	                                         attachment_ex_filter: str = None) -> list[AttachmentIdNamePair]:
+		from .gmail_custom_types.AttachmentIdNamePair import AttachmentIdNamePair
+
 		attachment_list: list[AttachmentIdNamePair] = []
 
 		if message.payload.parts:
@@ -86,12 +98,15 @@ class GmailService:
 
 		return attachment_list
 
+	@instrumented("gmail.download_attachments")
 	def download_attachments(
 			self,
 			attachment_list: list[AttachmentIdNamePair],
 			parent_folder: Path = Path("."),
 			rename_mapping_dict: dict[str, str] = None
 	) -> list[Path]:
+		from loguru import logger
+
 		attachment_full_path_list: list[Path] = []
 
 		for attachment_pair in attachment_list:
@@ -115,7 +130,10 @@ class GmailService:
 
 		return attachment_full_path_list
 
+	@instrumented("gmail.read_csv_attachment_to_pandas")
 	def read_csv_attachment_to_pandas(self, attachment_pair: AttachmentIdNamePair) -> pd.DataFrame:
+		import pandas as pd
+
 		assert attachment_pair.attachment_file_name.split(".")[-1] == "csv"
 
 		data: str = self._get_data_from_attachment_pair(attachment_pair)
@@ -123,12 +141,20 @@ class GmailService:
 
 		return df
 
+	@instrumented("gmail.read_excel_attachment_to_pandas")
 	def read_excel_attachment_to_pandas(self, attachment_pair: AttachmentIdNamePair, password: str = None,
 	                                    sheet_name: str | list = None) -> pd.DataFrame:
 		assert attachment_pair.attachment_file_name.split(".")[-1] == "xlsx"
 
 		data: str = self._get_data_from_attachment_pair(attachment_pair)
 
+		return self._read_excel_data_to_pandas(data, password, sheet_name)
+
+	@staticmethod
+	def _read_excel_data_to_pandas(data: str, password: str = None, sheet_name: str | list = None) -> pd.DataFrame:
+		import msoffcrypto
+		import pandas as pd
+
 		if not password:
 			return pd.read_excel(BytesIO(base64.urlsafe_b64decode(data.encode("UTF-8"))), sheet_name=sheet_name,
 			                     dtype=str)
@@ -141,6 +167,8 @@ class GmailService:
 		return pd.read_excel(temp, sheet_name=sheet_name, dtype=str)
 
 	def _parse_messages_dict(self, messages_dict: dict) -> list[GmailMessage]:
+		from .gmail_custom_types.GmailMessage import GmailMessage
+
 		messages: list[GmailMessage] = []
 
 		if "messages" in messages_dict:
@@ -152,9 +180,13 @@ class GmailService:
 
 		return messages
 
-	def _build_message(self, from_email, destination_list, subject, body, body_type: str, attachments: list = None,
+	@staticmethod
+	def _build_message(from_email, destination_list, subject, body, body_type: str, attachments: list = None,
 	                   thread_id: str = None,
 	                   cc_list: list[str] = None, bcc_list: list[str] = None):
+		from email.mime.text import MIMEText
+		from email.mime.multipart import MIMEMultipart
+
 		def __add_info_to_message(_message):
 			_message["To"] = ", ".join(destination_list)
 			_message["From"] = from_email
@@ -175,7 +207,7 @@ class GmailService:
 			message.attach(MIMEText(body, body_type))
 
 			for filename in attachments:
-				self._add_attachment(message, filename)
+				GmailService._add_attachment(message, filename)
 
 		if thread_id:
 			return {"raw": urlsafe_b64encode(message.as_bytes()).decode(), "threadId": thread_id}
@@ -195,6 +227,12 @@ class GmailService:
 	# Adds the attachment with the given filename to the given message
 	@staticmethod
 	def _add_attachment(message, filename):
+		from email.mime.text import MIMEText
+		from email.mime.image import MIMEImage
+		from email.mime.audio import MIMEAudio
+		from email.mime.base import MIMEBase
+		from mimetypes import guess_type as guess_mime_type
+
 		content_type, encoding = guess_mime_type(filename)
 		if content_type is None or encoding is not None:
 			content_type = "application/octet-stream"
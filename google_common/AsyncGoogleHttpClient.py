@@ -0,0 +1,163 @@
+import asyncio
+import random
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from .Instrumentation import is_recording, record_http_call, record_page, record_retry
+
+
+class AsyncGoogleHttpClient:
+	"""Authorized httpx client shared by the async services, bounding the number of requests in flight.
+
+	Requests are retried with jittered exponential backoff on 429 and 5xx responses. Non idempotent methods are only
+	retried on 429, since a failed POST may still have been applied.
+	"""
+	_RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+	_NON_IDEMPOTENT_RETRY_STATUS_CODES = [429]
+	_IDEMPOTENT_METHODS = ["GET", "HEAD", "PUT", "DELETE"]
+
+	_MAX_RETRIES = 5
+	_MAX_BACKOFF_SECONDS = 64
+	_TIMEOUT_SECONDS = 300
+	_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+	_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+	def __init__(self, credentials, max_concurrency: int = 10):
+		self._credentials = credentials
+		self._max_concurrency = max_concurrency
+		self._semaphore: Optional[asyncio.Semaphore] = None
+		self._refresh_lock: Optional[asyncio.Lock] = None
+		self._client: Optional[httpx.AsyncClient] = None
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.aclose()
+
+	async def aclose(self):
+		if self._client is not None:
+			await self._client.aclose()
+			self._client = None
+
+	async def request(self, method: str, url: str, params: dict = None, json: dict = None, content: bytes = None,
+	                  headers: dict = None, file_path: Path = None) -> httpx.Response:
+		"""When file_path is given the file is streamed as the body, it is only opened once a request slot is free."""
+		retry_status_codes = self.__class__._RETRY_STATUS_CODES if method in self.__class__._IDEMPOTENT_METHODS \
+			else self.__class__._NON_IDEMPOTENT_RETRY_STATUS_CODES
+
+		for attempt in range(self.__class__._MAX_RETRIES + 1):
+			async with self._get_semaphore():
+				request_headers = await self._get_authorized_headers(headers)
+				request_content = content
+				if file_path is not None:
+					# Every attempt opens a new stream, so a retried request sends the file from the start
+					request_content = self._iter_file_chunks(file_path)
+					request_headers["Content-Length"] = str(file_path.stat().st_size)
+
+				response = await self._get_client().request(method, url, params=params, json=json,
+				                                            content=request_content, headers=request_headers)
+			if is_recording():
+				request_bytes = file_path.stat().st_size if file_path is not None else len(response.request.content)
+				record_http_call(request_bytes, len(response.content), response.status_code)
+
+			if response.status_code not in retry_status_codes or attempt == self.__class__._MAX_RETRIES:
+				response.raise_for_status()
+				return response
+
+			record_retry()
+			await asyncio.sleep(random.uniform(0, min(2 ** attempt, self.__class__._MAX_BACKOFF_SECONDS)))
+
+	async def request_json(self, method: str, url: str, params: dict = None, json: dict = None,
+	                       content: bytes = None, headers: dict = None, file_path: Path = None) -> dict:
+		response = await self.request(method, url, params=params, json=json, content=content, headers=headers,
+		                              file_path=file_path)
+
+		return response.json() if response.content else dict()
+
+	async def iter_pages(self, url: str, params: dict = None, page_token_param: str = "pageToken",
+	                     next_page_token_key: str = "nextPageToken") -> AsyncIterator[dict]:
+		"""Yield every page of a paginated GET, the next page is fetched while the caller handles the current one."""
+		params = dict(params or {})
+		next_page_task = asyncio.ensure_future(self.request_json("GET", url, params=params))
+
+		while next_page_task is not None:
+			page = await next_page_task
+			next_page_task = None
+			record_page()
+
+			if page.get(next_page_token_key):
+				next_page_task = asyncio.ensure_future(
+					self.request_json("GET", url, params={**params, page_token_param: page[next_page_token_key]}))
+
+			try:
+				yield page
+			except BaseException:
+				if next_page_task is not None:
+					next_page_task.cancel()
+				raise
+
+	async def download_to_file(self, url: str, file_path: Path, params: dict = None) -> Path:
+		async with self._get_semaphore():
+			async with self._get_client().stream("GET", url, params=params,
+			                                     headers=await self._get_authorized_headers()) as response:
+				response.raise_for_status()
+				downloaded_bytes = 0
+				with open(file_path, "wb") as file:
+					async for chunk in response.aiter_bytes(self.__class__._DOWNLOAD_CHUNK_SIZE):
+						file.write(chunk)
+						downloaded_bytes += len(chunk)
+
+		record_http_call(0, downloaded_bytes, response.status_code)
+
+		return file_path
+
+	@classmethod
+	async def _iter_file_chunks(cls, file_path: Path) -> AsyncIterator[bytes]:
+		with open(file_path, "rb") as file:
+			while True:
+				chunk = await asyncio.to_thread(file.read, cls._UPLOAD_CHUNK_SIZE)
+				if not chunk:
+					break
+
+				yield chunk
+
+	async def _get_authorized_headers(self, headers: dict = None) -> dict:
+		headers = dict(headers or {})
+
+		if not self._credentials.valid:
+			async with self._get_refresh_lock():
+				# Another task may have refreshed the token while this one was waiting for the lock
+				if not self._credentials.valid:
+					from google.auth.transport.requests import Request
+
+					await asyncio.to_thread(self._credentials.refresh, Request())
+
+		self._credentials.apply(headers)
+
+		return headers
+
+	def _get_client(self) -> httpx.AsyncClient:
+		if self._client is None:
+			self._client = httpx.AsyncClient(
+				timeout=self.__class__._TIMEOUT_SECONDS,
+				limits=httpx.Limits(max_connections=self._max_concurrency,
+				                    max_keepalive_connections=self._max_concurrency)
+			)
+
+		return self._client
+
+	# The semaphore and lock are created lazily so that they belong to the running event loop
+	def _get_semaphore(self) -> asyncio.Semaphore:
+		if self._semaphore is None:
+			self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+		return self._semaphore
+
+	def _get_refresh_lock(self) -> asyncio.Lock:
+		if self._refresh_lock is None:
+			self._refresh_lock = asyncio.Lock()
+
+		return self._refresh_lock
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .Instrumentation import InstrumentedHttp, get_body_size, is_recording, record_http_call
+
+if TYPE_CHECKING:
+	from google.auth.transport.requests import AuthorizedSession
+
+
+class GoogleClientFactory:
+	"""Share credentials and HTTP transports between the service clients of a process.
+
+	Credentials are shared per file and scope set, so every client only gets the scopes it asks for. A factory created
+	with shared_scopes adds them to every service account scope set instead, which lets BigQuery, GCS and Sheets refresh
+	a single token at the cost of broader tokens. Discovery based services use the bundled discovery documents and one
+	keep-alive httplib2 connection per thread, because httplib2 is not thread safe.
+
+	The transport and auth libraries are imported on first use, so that importing a client stays cheap.
+	"""
+	_POOL_CONNECTIONS = 10
+	_POOL_MAXSIZE = 32
+	_HTTP_TIMEOUT_SECONDS = 300
+
+	_default_factory = None
+	_default_factory_lock = threading.Lock()
+
+	def __init__(self, pool_maxsize: int = None, shared_scopes: list[str] = None):
+		self._pool_maxsize = pool_maxsize or self.__class__._POOL_MAXSIZE
+		self._shared_scopes = shared_scopes or []
+		self._credentials: dict[tuple, object] = dict()
+		self._sessions: dict[int, AuthorizedSession] = dict()
+		self._discovery_services: dict[tuple, object] = dict()
+		self._thread_local = threading.local()
+		self._lock = threading.RLock()
+
+	@classmethod
+	def default(cls) -> "GoogleClientFactory":
+		with cls._default_factory_lock:
+			if cls._default_factory is None:
+				cls._default_factory = cls()
+
+			return cls._default_factory
+
+	def get_service_account_credentials(self, sa_file_path: Path, scopes: list[str]):
+		scopes = sorted(set(scopes) | set(self._shared_scopes))
+		key = ("service_account", Path(sa_file_path).resolve().as_posix(), tuple(scopes))
+
+		from google.oauth2 import service_account
+
+		with self._lock:
+			if key not in self._credentials:
+				self._credentials[key] = service_account.Credentials.from_service_account_file(
+					Path(sa_file_path).as_posix(), scopes=scopes
+				)
+
+			return self._credentials[key]
+
+	def get_authorized_user_credentials(self, authorized_user_file_path: Path, scopes: list[str]):
+		from google.oauth2 import credentials
+
+		key = ("authorized_user", Path(authorized_user_file_path).resolve().as_posix(), tuple(sorted(scopes)))
+
+		with self._lock:
+			if key not in self._credentials:
+				self._credentials[key] = credentials.Credentials.from_authorized_user_file(
+					Path(authorized_user_file_path).as_posix(), scopes=scopes
+				)
+
+			return self._credentials[key]
+
+	def get_installed_app_credentials(self, credentials_path: Path, token_path: Path, scopes: list[str]):
+		from google.oauth2 import credentials
+
+		key = ("installed_app", Path(token_path).resolve().as_posix(), tuple(sorted(scopes)))
+
+		with self._lock:
+			if key in self._credentials:
+				return self._credentials[key]
+
+			creds = None
+			# The token file stores the user's access and refresh tokens, and is
+			# created automatically when the authorization flow completes for the first
+			# time.
+			if os.path.exists(token_path):
+				creds = credentials.Credentials.from_authorized_user_file(Path(token_path).as_posix(), scopes)
+			# If there are no (valid) credentials available, let the user log in.
+			if not creds or not creds.valid:
+				if creds and creds.expired and creds.refresh_token:
+					from google.auth.transport.requests import Request
+
+					creds.refresh(Request())
+				else:
+					from google_auth_oauthlib.flow import InstalledAppFlow
+
+					flow = InstalledAppFlow.from_client_secrets_file(Path(credentials_path).as_posix(), scopes)
+					creds = flow.run_local_server(port=0)
+				# Save the credentials for the next run
+				with open(token_path, "w") as token:
+					token.write(creds.to_json())
+
+			self._credentials[key] = creds
+
+			return creds
+
+	def get_authorized_session(self, creds) -> AuthorizedSession:
+		from google.auth.transport.requests import AuthorizedSession
+		from requests.adapters import HTTPAdapter
+
+		with self._lock:
+			if id(creds) not in self._sessions:
+				session = AuthorizedSession(creds)
+				adapter = HTTPAdapter(pool_connections=self.__class__._POOL_CONNECTIONS,
+				                      pool_maxsize=self._pool_maxsize)
+				session.mount("https://", adapter)
+				session.mount("http://", adapter)
+				session.hooks["response"].append(self._record_response)
+				self._sessions[id(creds)] = session
+
+			return self._sessions[id(creds)]
+
+	def build_discovery_service(self, service_name: str, service_version: str, creds):
+		from googleapiclient.discovery import build
+
+		key = (service_name, service_version, id(creds))
+
+		with self._lock:
+			if key not in self._discovery_services:
+				self._discovery_services[key] = build(
+					service_name,
+					service_version,
+					http=self._get_thread_local_http(creds),
+					requestBuilder=self._create_request_builder(creds),
+					static_discovery=True,
+					cache_discovery=False
+				)
+
+			return self._discovery_services[key]
+
+	def _create_request_builder(self, creds):
+		from googleapiclient.http import HttpRequest
+
+		def __build_request(http, *args, **kwargs):
+			# The resource may be shared between threads, so each request runs on the caller thread's connection
+			return HttpRequest(self._get_thread_local_http(creds), *args, **kwargs)
+
+		return __build_request
+
+	@staticmethod
+	def _record_response(response, *args, **kwargs):
+		if not is_recording():
+			return
+
+		# The body is not read here so that streamed downloads stay streamed, the size comes from Content-Length
+		record_http_call(get_body_size(response.request.body), int(response.headers.get("Content-Length", 0)),
+		                 response.status_code)
+
+	def _get_thread_local_http(self, creds) -> InstrumentedHttp:
+		import httplib2
+		import google_auth_httplib2
+
+		if not hasattr(self._thread_local, "http_dict"):
+			self._thread_local.http_dict = dict()
+
+		if id(creds) not in self._thread_local.http_dict:
+			self._thread_local.http_dict[id(creds)] = InstrumentedHttp(google_auth_httplib2.AuthorizedHttp(
+				creds, http=httplib2.Http(timeout=self.__class__._HTTP_TIMEOUT_SECONDS)
+			))
+
+		return self._thread_local.http_dict[id(creds)]
@@ -0,0 +1,295 @@
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional
+
+_current_span: contextvars.ContextVar[Optional["CallSpan"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class CallSpan:
+	__slots__ = ("operation", "start_time", "duration_seconds", "request_count", "page_count", "retry_count",
+	             "request_bytes", "response_bytes", "http_status", "error", "_lock")
+
+	def __init__(self, operation: str):
+		self.operation = operation
+		self.start_time = time.time()
+		self.duration_seconds = 0.0
+		self.request_count = 0
+		self.page_count = 0
+		self.retry_count = 0
+		self.request_bytes = 0
+		self.response_bytes = 0
+		self.http_status: Optional[int] = None
+		self.error: Optional[str] = None
+		self._lock = threading.Lock()
+
+	def add_counts(self, request_count: int = 0, page_count: int = 0, retry_count: int = 0, request_bytes: int = 0,
+	               response_bytes: int = 0, http_status: int = None):
+		# Requests sent from a thread pool record into the same span concurrently
+		with self._lock:
+			self.request_count += request_count
+			self.page_count += page_count
+			self.retry_count += retry_count
+			self.request_bytes += request_bytes
+			self.response_bytes += response_bytes
+			if http_status is not None:
+				self.http_status = http_status
+
+
+class Instrumentation:
+	"""Collect one CallSpan per public service call and hand it to the callbacks once the call is over.
+
+	Services only open a span when an Instrumentation is given to them, and nested service calls are folded into the
+	outermost span. The transports record requests, bytes and statuses into the current span, which is a single context
+	variable lookup when nothing is being instrumented.
+	"""
+
+	def __init__(self, callbacks: list[Callable[[CallSpan], None]] = None):
+		self._callbacks: list[Callable[[CallSpan], None]] = list(callbacks or [])
+
+	def add_callback(self, callback: Callable[[CallSpan], None]):
+		self._callbacks.append(callback)
+
+	@contextmanager
+	def span(self, operation: str):
+		call_span = CallSpan(operation)
+		token = _current_span.set(call_span)
+
+		try:
+			yield call_span
+		except BaseException as e:
+			call_span.error = type(e).__name__
+			raise
+		finally:
+			_current_span.reset(token)
+			self.finish_span(call_span)
+
+	def finish_span(self, call_span: CallSpan):
+		call_span.duration_seconds = time.time() - call_span.start_time
+		for callback in self._callbacks:
+			callback(call_span)
+
+
+def instrumented(operation: str):
+	"""Decorate a service method so that it runs in a span when the service has an Instrumentation."""
+
+	def __decorator(func):
+		if inspect.isasyncgenfunction(func):
+			@functools.wraps(func)
+			async def __async_gen_wrapper(self, *args, **kwargs):
+				instrumentation = self._instrumentation
+				if instrumentation is None or _current_span.get() is not None:
+					async for item in func(self, *args, **kwargs):
+						yield item
+					return
+
+				# The span is only current while the generator runs, so the caller's own calls between two items are
+				# not attributed to it
+				call_span = CallSpan(operation)
+				iterator = func(self, *args, **kwargs).__aiter__()
+				try:
+					while True:
+						token = _current_span.set(call_span)
+						try:
+							item = await iterator.__anext__()
+						except StopAsyncIteration:
+							break
+						finally:
+							_current_span.reset(token)
+
+						yield item
+				except Exception as e:
+					call_span.error = type(e).__name__
+					raise
+				finally:
+					await iterator.aclose()
+					instrumentation.finish_span(call_span)
+
+			return __async_gen_wrapper
+
+		if inspect.iscoroutinefunction(func):
+			@functools.wraps(func)
+			async def __async_wrapper(self, *args, **kwargs):
+				instrumentation = self._instrumentation
+				if instrumentation is None or _current_span.get() is not None:
+					return await func(self, *args, **kwargs)
+
+				with instrumentation.span(operation):
+					return await func(self, *args, **kwargs)
+
+			return __async_wrapper
+
+		@functools.wraps(func)
+		def __wrapper(self, *args, **kwargs):
+			instrumentation = self._instrumentation
+			if instrumentation is None or _current_span.get() is not None:
+				return func(self, *args, **kwargs)
+
+			with instrumentation.span(operation):
+				return func(self, *args, **kwargs)
+
+		return __wrapper
+
+	return __decorator
+
+
+def is_recording() -> bool:
+	"""Whether a span is active, so callers can skip measuring requests when instrumentation is off."""
+	return _current_span.get() is not None
+
+
+def record_http_call(request_bytes: int, response_bytes: int, http_status: int):
+	call_span = _current_span.get()
+	if call_span is not None:
+		call_span.add_counts(request_count=1, request_bytes=request_bytes, response_bytes=response_bytes,
+		                     http_status=http_status)
+
+
+def record_page():
+	call_span = _current_span.get()
+	if call_span is not None:
+		call_span.add_counts(page_count=1)
+
+
+def record_retry():
+	call_span = _current_span.get()
+	if call_span is not None:
+		call_span.add_counts(retry_count=1)
+
+
+def iter_page_items(page_iterator) -> Iterator:
+	"""Iterate the items of a google.api_core page iterator, recording every page in the current span."""
+	for page in page_iterator.pages:
+		record_page()
+		yield from page
+
+
+def map_in_context(executor: Executor, func: Callable, *iterables: Iterable) -> list:
+	"""Like Executor.map, but every call runs in a copy of the caller's context so its requests count toward the
+	current span."""
+	futures = [executor.submit(contextvars.copy_context().run, func, *args) for args in zip(*iterables)]
+
+	return [future.result() for future in futures]
+
+
+def get_body_size(body) -> int:
+	if body is None:
+		return 0
+	if isinstance(body, (bytes, bytearray, str)):
+		return len(body)
+
+	# Streamed bodies (files, generators) are not read just to be measured
+	return 0
+
+
+class InstrumentedHttp:
+	"""Wrap an httplib2 compatible object so that every request of a discovery based service is recorded."""
+
+	def __init__(self, http):
+		self._http = http
+
+	def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+		response, content = self._http.request(uri, method, body, headers, *args, **kwargs)
+		if is_recording():
+			record_http_call(get_body_size(body), len(content or b""), response.status)
+
+		return response, content
+
+	def __getattr__(self, name):
+		return getattr(self._http, name)
+
+
+class InMemoryAggregator:
+	def __init__(self):
+		self._summary: dict[str, dict[str, float]] = dict()
+		self._lock = threading.Lock()
+
+	def __call__(self, call_span: CallSpan):
+		with self._lock:
+			operation_summary = self._summary.setdefault(call_span.operation, {
+				"count": 0, "error_count": 0, "total_duration_seconds": 0.0, "max_duration_seconds": 0.0,
+				"request_count": 0, "page_count": 0, "retry_count": 0, "request_bytes": 0, "response_bytes": 0
+			})
+			operation_summary["count"] += 1
+			operation_summary["error_count"] += 1 if call_span.error else 0
+			operation_summary["total_duration_seconds"] += call_span.duration_seconds
+			operation_summary["max_duration_seconds"] = max(operation_summary["max_duration_seconds"],
+			                                                call_span.duration_seconds)
+			for counter_name in ("request_count", "page_count", "retry_count", "request_bytes", "response_bytes"):
+				operation_summary[counter_name] += getattr(call_span, counter_name)
+
+	def get_summary(self) -> dict[str, dict[str, float]]:
+		with self._lock:
+			summary = {operation: dict(operation_summary) for operation, operation_summary in self._summary.items()}
+
+		for operation_summary in summary.values():
+			operation_summary["avg_duration_seconds"] = operation_summary["total_duration_seconds"] / \
+			                                            operation_summary["count"]
+
+		return summary
+
+	def reset(self):
+		with self._lock:
+			self._summary.clear()
+
+
+class PrometheusExporter:
+	def __init__(self, registry=None, namespace: str = "google_service_api"):
+		from prometheus_client import Counter, Histogram, REGISTRY
+
+		registry = registry or REGISTRY
+		self._duration = Histogram(f"{namespace}_call_duration_seconds", "Duration of service calls",
+		                           ["operation", "status"], registry=registry)
+		self._requests = Counter(f"{namespace}_http_requests", "HTTP requests made by service calls", ["operation"],
+		                         registry=registry)
+		self._pages = Counter(f"{namespace}_pages", "Pages fetched by service calls", ["operation"], registry=registry)
+		self._retries = Counter(f"{namespace}_retries", "Retries made by service calls", ["operation"],
+		                        registry=registry)
+		self._bytes = Counter(f"{namespace}_bytes", "Bytes moved by service calls", ["operation", "direction"],
+		                      registry=registry)
+
+	def __call__(self, call_span: CallSpan):
+		self._duration.labels(call_span.operation, "error" if call_span.error else "ok").observe(
+			call_span.duration_seconds)
+		self._requests.labels(call_span.operation).inc(call_span.request_count)
+		self._pages.labels(call_span.operation).inc(call_span.page_count)
+		self._retries.labels(call_span.operation).inc(call_span.retry_count)
+		self._bytes.labels(call_span.operation, "request").inc(call_span.request_bytes)
+		self._bytes.labels(call_span.operation, "response").inc(call_span.response_bytes)
+
+
+class OpenTelemetryExporter:
+	def __init__(self, tracer=None, meter=None):
+		from opentelemetry import metrics, trace
+
+		self._tracer = tracer or trace.get_tracer("google_service_api")
+		meter = meter or metrics.get_meter("google_service_api")
+		self._duration = meter.create_histogram("google_service_api.call.duration", unit="s",
+		                                        description="Duration of service calls")
+		self._bytes = meter.create_counter("google_service_api.call.bytes", unit="By",
+		                                   description="Bytes moved by service calls")
+
+	def __call__(self, call_span: CallSpan):
+		from opentelemetry.trace import Status, StatusCode
+
+		start_time_ns = int(call_span.start_time * 1e9)
+		otel_span = self._tracer.start_span(call_span.operation, start_time=start_time_ns, attributes={
+			"request_count": call_span.request_count,
+			"page_count": call_span.page_count,
+			"retry_count": call_span.retry_count,
+			"request_bytes": call_span.request_bytes,
+			"response_bytes": call_span.response_bytes,
+			"http.status_code": call_span.http_status or 0
+		})
+		if call_span.error:
+			otel_span.set_status(Status(StatusCode.ERROR, call_span.error))
+		otel_span.end(end_time=start_time_ns + int(call_span.duration_seconds * 1e9))
+
+		attributes = {"operation": call_span.operation}
+		self._duration.record(call_span.duration_seconds, attributes=attributes)
+		self._bytes.add(call_span.request_bytes, attributes={**attributes, "direction": "request"})
+		self._bytes.add(call_span.response_bytes, attributes={**attributes, "direction": "response"})
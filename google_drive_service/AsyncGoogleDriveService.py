@@ -0,0 +1,121 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncIterator
+
+from google_common.AsyncGoogleHttpClient import AsyncGoogleHttpClient
+from google_common.Instrumentation import Instrumentation, instrumented
+
+from .GoogleDriveClient import GoogleDriveClient
+from .GoogleDriveService import GoogleDriveService
+
+
+class AsyncGoogleDriveService:
+	"""Async counterpart of GoogleDriveService, with the same methods."""
+	_BASE_URL = "https://www.googleapis.com/drive/v3/files"
+	_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files"
+
+	def __init__(self, client: GoogleDriveClient, max_concurrency: int = 10, instrumentation: Instrumentation = None):
+		self._http = AsyncGoogleHttpClient(client.credentials, max_concurrency=max_concurrency)
+		self._instrumentation = instrumentation
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.aclose()
+
+	async def aclose(self):
+		await self._http.aclose()
+
+	@instrumented("drive_async.upload_file_to_drive")
+	async def upload_file_to_drive(self, file_path: Path, parent_folder_id: str = None, file_name: str = None) -> str:
+		file_metadata = {
+			"name": file_name if file_name else file_path.name,
+			"parents": [parent_folder_id] if parent_folder_id else None
+		}
+		# A resumable session is opened with the metadata, the content is then sent in a single request
+		response = await self._http.request(
+			"POST", self.__class__._UPLOAD_URL,
+			params={"uploadType": "resumable", "supportsAllDrives": "true", "fields": "id"},
+			content=json.dumps(file_metadata).encode("UTF-8"),
+			headers={"Content-Type": "application/json; charset=UTF-8"}
+		)
+		uploaded_file = await self._http.request_json("PUT", response.headers["Location"], file_path=file_path)
+
+		return uploaded_file.get("id")
+
+	@instrumented("drive_async.upload_folder_to_drive")
+	async def upload_folder_to_drive(self, folder_path: Path, parent_folder_id: str = None) -> str:
+		folder_metadata = {
+			"name": folder_path.name,
+			"parents": [parent_folder_id] if parent_folder_id else None,
+			"mimeType": GoogleDriveService._FOLDER_MIME_TYPE
+		}
+		folder = await self._http.request_json("POST", self.__class__._BASE_URL,
+		                                       params={"supportsAllDrives": "true", "fields": "id"},
+		                                       json=folder_metadata)
+
+		await asyncio.gather(*(
+			self.upload_folder_to_drive(folder_path=file_path, parent_folder_id=folder["id"]) if file_path.is_dir()
+			else self.upload_file_to_drive(file_path=file_path, parent_folder_id=folder["id"])
+			for file_path in folder_path.iterdir()
+		))
+
+		return folder["id"]
+
+	@instrumented("drive_async.download_file_from_drive")
+	async def download_file_from_drive(self, file_id: str, parent_directory: Path) -> Path:
+		file_name = (await self._get_obj_by_id(file_id=file_id)).get("name")
+		file_path = GoogleDriveService._get_available_path(parent_directory / file_name)
+		# The path is taken before the next await, so sibling downloads of files with the same name cannot pick it too
+		file_path.touch(exist_ok=False)
+
+		return await self._http.download_to_file(f"{self.__class__._BASE_URL}/{file_id}", file_path,
+		                                         params={"alt": "media", "supportsAllDrives": "true"})
+
+	@instrumented("drive_async.download_folder_from_drive")
+	async def download_folder_from_drive(self, folder_id: str, parent_directory: Path) -> Path:
+		folder_name = (await self._get_obj_by_id(file_id=folder_id)).get("name")
+		folder_path = GoogleDriveService._get_available_path(parent_directory / folder_name)
+		folder_path.mkdir()
+
+		# Downloads start as soon as a page of children is listed, while the next page is being fetched
+		download_tasks = []
+		async for obj in self.iter_objects_in_folder(parent_id=folder_id):
+			if obj["mimeType"] == GoogleDriveService._FOLDER_MIME_TYPE:
+				download_tasks.append(asyncio.ensure_future(
+					self.download_folder_from_drive(folder_id=obj["id"], parent_directory=folder_path)))
+			else:
+				download_tasks.append(asyncio.ensure_future(
+					self.download_file_from_drive(file_id=obj["id"], parent_directory=folder_path)))
+
+		await asyncio.gather(*download_tasks)
+
+		return folder_path
+
+	@instrumented("drive_async.list_file_names")
+	async def list_file_names(self, parent_folder_id: str) -> list[str]:
+		return [obj["name"] async for obj in self.iter_objects_in_folder(parent_id=parent_folder_id) if
+		        obj["mimeType"] != GoogleDriveService._FOLDER_MIME_TYPE]
+
+	@instrumented("drive_async.list_folder_names")
+	async def list_folder_names(self, parent_folder_id: str) -> list[str]:
+		return [obj["name"] async for obj in self.iter_objects_in_folder(parent_id=parent_folder_id) if
+		        obj["mimeType"] == GoogleDriveService._FOLDER_MIME_TYPE]
+
+	@instrumented("drive_async.iter_objects_in_folder")
+	async def iter_objects_in_folder(self, parent_id: str = None, object_name: str = None) -> AsyncIterator[dict]:
+		params = {
+			"q": GoogleDriveService._build_list_query(parent_id=parent_id, object_name=object_name),
+			"fields": "nextPageToken, files(id, name, mimeType)",
+			"supportsAllDrives": "true",
+			"includeItemsFromAllDrives": "true"
+		}
+		async for page in self._http.iter_pages(self.__class__._BASE_URL, params=params):
+			for obj in page.get("files", []):
+				yield obj
+
+	async def _get_obj_by_id(self, file_id: str) -> dict:
+		return await self._http.request_json("GET", f"{self.__class__._BASE_URL}/{file_id}",
+		                                     params={"supportsAllDrives": "true"})
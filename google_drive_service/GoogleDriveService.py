@@ -1,14 +1,19 @@
 import os.path
 from pathlib import Path
-from googleapiclient.http import MediaIoBaseDownload
+
+from google_common.Instrumentation import Instrumentation, instrumented, record_page
 
 from .GoogleDriveClient import GoogleDriveClient
 
 
 class GoogleDriveService:
-	def __init__(self, client: GoogleDriveClient):
+	_FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+	def __init__(self, client: GoogleDriveClient, instrumentation: Instrumentation = None):
 		self._service = client.service
+		self._instrumentation = instrumentation
 
+	@instrumented("drive.upload_file_to_drive")
 	def upload_file_to_drive(self, file_path: Path, parent_folder_id: str = None, file_name: str = None):
 		file_metadata = {
 			"name": file_name if file_name else file_path.name,
@@ -21,11 +26,12 @@ class GoogleDriveService:
 			supportsAllDrives=True
 		).execute()
 
+	@instrumented("drive.upload_folder_to_drive")
 	def upload_folder_to_drive(self, folder_path: Path, parent_folder_id: str = None):
 		folder_metadata = {
 			"name": folder_path.name,
 			"parents": [parent_folder_id] if parent_folder_id else None,
-			"mimeType": "application/vnd.google-apps.folder"
+			"mimeType": self.__class__._FOLDER_MIME_TYPE
 		}
 		folder_id = self._service.files().create(
 			body=folder_metadata,
@@ -39,12 +45,12 @@ class GoogleDriveService:
 			else:
 				self.upload_file_to_drive(file_path=file_path, parent_folder_id=folder_id)
 
+	@instrumented("drive.download_file_from_drive")
 	def download_file_from_drive(self, file_id: str, parent_directory: Path):
 		file_name = self._get_obj_by_id(file_id=file_id).get("name")
-		file_path = parent_directory / file_name
+		file_path = self._get_available_path(parent_directory / file_name)
 
-		if os.path.exists(file_path):
-			file_path = Path(f"{file_path.parent}/{file_path.stem} (1){file_path.suffix}")
+		from googleapiclient.http import MediaIoBaseDownload
 
 		request = self._service.files().get_media(fileId=file_id, supportsAllDrives=True)
 		fh = file_path.open("wb")
@@ -53,39 +59,55 @@ class GoogleDriveService:
 		while not done:
 			status, done = downloader.next_chunk()
 
+	@instrumented("drive.download_folder_from_drive")
 	def download_folder_from_drive(self, folder_id: str, parent_directory: Path):
 		folder_name = self._get_obj_by_id(file_id=folder_id).get("name")
-		folder_path = parent_directory / folder_name
-
-		if os.path.exists(folder_path):
-			folder_path = Path(f"{folder_path.parent}/{folder_path.stem} (1){folder_path.suffix}")
+		folder_path = self._get_available_path(parent_directory / folder_name)
 		folder_path.mkdir()
 
 		obj_ids = [obj["id"] for obj in self._list_objects_in_folder(parent_id=folder_id)]
 		for obj_id in obj_ids:
-			if self._get_obj_by_id(file_id=obj_id).get("mimeType") == "application/vnd.google-apps.folder":
+			if self._get_obj_by_id(file_id=obj_id).get("mimeType") == self.__class__._FOLDER_MIME_TYPE:
 				self.download_folder_from_drive(folder_id=obj_id, parent_directory=folder_path)
 			else:
 				self.download_file_from_drive(file_id=obj_id, parent_directory=folder_path)
 
+	@instrumented("drive.list_file_names")
 	def list_file_names(self, parent_folder_id: str):
 		return [obj["name"] for obj in self._list_objects_in_folder(parent_id=parent_folder_id) if
-		        obj["mimeType"] != "application/vnd.google-apps.folder"]
+		        obj["mimeType"] != self.__class__._FOLDER_MIME_TYPE]
 
+	@instrumented("drive.list_folder_names")
 	def list_folder_names(self, parent_folder_id: str):
 		return [obj["name"] for obj in self._list_objects_in_folder(parent_id=parent_folder_id) if
-		        obj["mimeType"] == "application/vnd.google-apps.folder"]
+		        obj["mimeType"] == self.__class__._FOLDER_MIME_TYPE]
 
 	def _list_objects_in_folder(self, parent_id: str = None, object_name: str = None):
-		query = f"'{parent_id}' in parents and trashed=false" if parent_id else ""
-		query += f" and name='{object_name}'" if object_name else ""
 		response = self._service.files().list(
-			q=query,
+			q=self._build_list_query(parent_id=parent_id, object_name=object_name),
 			fields="nextPageToken, files",
 			supportsAllDrives=True,
 			includeItemsFromAllDrives=True
 		).execute()
+		record_page()
 		return response.get("files", [])
 
 	def _get_obj_by_id(self, file_id: str):
 		return self._service.files().get(fileId=file_id, supportsAllDrives=True).execute()
+
+	@staticmethod
+	def _build_list_query(parent_id: str = None, object_name: str = None) -> str:
+		query = f"'{parent_id}' in parents and trashed=false" if parent_id else ""
+		query += f" and name='{object_name}'" if object_name else ""
+
+		return query
+
+	@staticmethod
+	def _get_available_path(path: Path) -> Path:
+		index: int = 1
+		available_path = path
+		while os.path.exists(available_path):
+			available_path = Path(f"{path.parent}/{path.stem} ({index}){path.suffix}")
+			index += 1
+
+		return available_path
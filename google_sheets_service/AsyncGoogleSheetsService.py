@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional, TYPE_CHECKING
+from urllib.parse import quote
+
+import gspread
+
+from google_common.AsyncGoogleHttpClient import AsyncGoogleHttpClient
+from google_common.Instrumentation import Instrumentation, instrumented
+
+from .GoogleSheetsClient import GoogleSheetsClient
+from .GoogleSheetsService import GoogleSheetsService
+from .SheetsQuotaLimiter import SheetsQuotaLimiter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class AsyncGoogleSheetsService:
+    """Async counterpart of the value reads and writes of GoogleSheetsService, addressed by spreadsheet key and
+    worksheet title instead of gspread objects.
+
+    Opening and creating spreadsheets, write_df_to_sheet and the DIFF mode of write_df_to_sheet_in_chunks stay on
+    GoogleSheetsService.
+    """
+    _BASE_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+
+    def __init__(self, client: GoogleSheetsClient, quota_limiter: SheetsQuotaLimiter = None,
+                 max_concurrency: int = 10, instrumentation: Instrumentation = None):
+        self._http = AsyncGoogleHttpClient(client.credentials, max_concurrency=max_concurrency)
+        self._quota_limiter = quota_limiter or SheetsQuotaLimiter.from_credentials(client.credentials)
+        self._instrumentation = instrumentation
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    @instrumented("sheets_async.get_worksheet_properties")
+    async def get_worksheet_properties(self, spreadsheet_key: str, worksheet_title: str) -> dict:
+        await self._quota_limiter.acquire_async("READ")
+        spreadsheet = await self._http.request_json("GET", f"{self.__class__._BASE_URL}/{spreadsheet_key}",
+                                                    params={"fields": "sheets.properties"})
+
+        for sheet in spreadsheet.get("sheets", []):
+            if sheet["properties"]["title"] == worksheet_title:
+                return sheet["properties"]
+
+        raise gspread.exceptions.WorksheetNotFound(worksheet_title)
+
+    @instrumented("sheets_async.read_data_from_sheet_to_pandas")
+    async def read_data_from_sheet_to_pandas(self, spreadsheet_key: str, worksheet_title: str,
+                                             starting_cell_str: str = "A1", end_cell_row: int = None,
+                                             end_cell_col_str: str = None, include_header: bool = True):
+        starting_cell_row, starting_cell_col = GoogleSheetsService.extract_row_and_column_int_from_string(
+            starting_cell_str)
+
+        # A single values GET with open-ended rows, the API trims them to the data. Without an end column A1 notation
+        # cannot bound the columns, so the whole worksheet is read and the cells before the starting cell are dropped
+        if end_cell_col_str:
+            end_cell_col: int = GoogleSheetsService.extract_row_and_column_int_from_string(end_cell_col_str)[1]
+            range_str: str = f"{GoogleSheetsService.convert_column_int_to_string(starting_cell_col)}" \
+                             f"{starting_cell_row}:{GoogleSheetsService.convert_column_int_to_string(end_cell_col)}"
+            range_name: str = gspread.utils.absolute_range_name(worksheet_title, range_str)
+        else:
+            range_name: str = gspread.utils.absolute_range_name(worksheet_title)
+
+        await self._quota_limiter.acquire_async("READ")
+        value_range = await self._http.request_json(
+            "GET", f"{self.__class__._BASE_URL}/{spreadsheet_key}/values/{quote(range_name, safe='')}")
+        values: list[list[str]] = value_range.get("values", [])
+
+        if not end_cell_col_str:
+            values = [row[starting_cell_col - 1:] for row in values[starting_cell_row - 1:]]
+        if end_cell_row:
+            values = values[:max(end_cell_row - starting_cell_row + 1, 0)]
+
+        return GoogleSheetsService._build_dataframe_from_values(values, include_header)
+
+    @instrumented("sheets_async.read_ranges_from_spreadsheet_to_pandas")
+    async def read_ranges_from_spreadsheet_to_pandas(self, spreadsheet_key: str,
+                                                     range_list: list[tuple[str, Optional[str]]],
+                                                     include_header: bool = True) \
+            -> dict[tuple[str, Optional[str]], pd.DataFrame]:
+        range_names: list[str] = [gspread.utils.absolute_range_name(worksheet_title, range_str)
+                                  for worksheet_title, range_str in range_list]
+        await self._quota_limiter.acquire_async("READ")
+        response = await self._http.request_json("GET", f"{self.__class__._BASE_URL}/{spreadsheet_key}/values:batchGet",
+                                                 params={"ranges": range_names})
+
+        df_list = [GoogleSheetsService._build_dataframe_from_values(value_range.get("values", []), include_header)
+                   for value_range in response.get("valueRanges", [])]
+
+        return dict(zip(range_list, df_list))
+
+    @instrumented("sheets_async.write_df_to_sheet_in_chunks")
+    async def write_df_to_sheet_in_chunks(self, spreadsheet_key: str, worksheet_title: str, df_to_write: pd.DataFrame,
+                                          starting_cell: str = "A1", include_header: bool = True,
+                                          max_cells_per_request: int = 50000) -> None:
+        start_row_int, start_col_int = GoogleSheetsService.extract_row_and_column_int_from_string(starting_cell)
+        values = GoogleSheetsService._convert_df_to_values(df_to_write, include_header)
+        if not values:
+            return
+
+        properties = await self.get_worksheet_properties(spreadsheet_key, worksheet_title)
+        await self._resize_worksheet_to_fit(spreadsheet_key, properties, start_row_int + len(values) - 1,
+                                            start_col_int + len(values[0]) - 1)
+
+        async def __send(request_data: list[dict]):
+            await self._quota_limiter.acquire_async("WRITE")
+            await self._http.request_json(
+                "POST", f"{self.__class__._BASE_URL}/{spreadsheet_key}/values:batchUpdate",
+                json={
+                    "valueInputOption": GoogleSheetsService._VALUE_INPUT_OPTION,
+                    "data": [{"range": gspread.utils.absolute_range_name(worksheet_title, data["range"]),
+                              "values": data["values"]} for data in request_data]
+                }
+            )
+
+        # The chunks cover disjoint ranges, so they can be sent concurrently
+        await asyncio.gather(*(__send(request_data) for request_data in GoogleSheetsService._chunk_update_requests(
+            [(start_row_int, start_col_int, values)], max_cells_per_request)))
+
+    @instrumented("sheets_async.append_df_to_sheet")
+    async def append_df_to_sheet(self, spreadsheet_key: str, worksheet_title: str, df_to_append: pd.DataFrame,
+                                 max_cells_per_request: int = 50000) -> None:
+        values = GoogleSheetsService._convert_df_to_values(df_to_append, include_header=False)
+        if not values:
+            return
+
+        append_url = f"{self.__class__._BASE_URL}/{spreadsheet_key}/values/" \
+                     f"{quote(gspread.utils.absolute_range_name(worksheet_title), safe='')}:append"
+        rows_per_request = max(max_cells_per_request // len(values[0]), 1)
+        # Appends are sent one after the other to keep the rows in order
+        for offset in range(0, len(values), rows_per_request):
+            await self._quota_limiter.acquire_async("WRITE")
+            await self._http.request_json("POST", append_url,
+                                          params={"valueInputOption": GoogleSheetsService._VALUE_INPUT_OPTION,
+                                                  "insertDataOption": "INSERT_ROWS"},
+                                          json={"values": values[offset:offset + rows_per_request]})
+
+    async def _resize_worksheet_to_fit(self, spreadsheet_key: str, properties: dict, end_row: int, end_col: int):
+        row_count, col_count = properties["gridProperties"]["rowCount"], properties["gridProperties"]["columnCount"]
+        if end_row <= row_count and end_col <= col_count:
+            return
+
+        await self._quota_limiter.acquire_async("WRITE")
+        await self._http.request_json("POST", f"{self.__class__._BASE_URL}/{spreadsheet_key}:batchUpdate", json={
+            "requests": [{
+                "updateSheetProperties": {
+                    "properties": {
+                        "sheetId": properties["sheetId"],
+                        "gridProperties": {"rowCount": max(end_row, row_count), "columnCount": max(end_col, col_count)}
+                    },
+                    "fields": "gridProperties(rowCount,columnCount)"
+                }
+            }]
+        })
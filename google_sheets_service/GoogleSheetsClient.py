@@ -1,33 +1,46 @@
 from __future__ import print_function
 from functools import cached_property
 from pathlib import Path
-from dotenv import load_dotenv, find_dotenv
 import os
 import gspread
 
-load_dotenv(find_dotenv())
+from google_common.GoogleClientFactory import GoogleClientFactory
 
 
 class GoogleSheetsClient:
-	def __init__(self, sa_file_path: Path = None, credentials_path: Path = None, sheets_token_path: Path = None):
+	_SCOPES = [
+		"https://www.googleapis.com/auth/spreadsheets",
+		"https://www.googleapis.com/auth/drive",
+	]
+
+	def __init__(self, sa_file_path: Path = None, credentials_path: Path = None, sheets_token_path: Path = None,
+	             client_factory: GoogleClientFactory = None):
 		self._sa_file_path = sa_file_path
 		self._credentials_path = credentials_path
 		self._sheets_token_path = sheets_token_path
+		self._client_factory = client_factory or GoogleClientFactory.default()
 
 	@cached_property
-	def service(self):
+	def credentials(self):
 		if self._sa_file_path:
-			return gspread.service_account(filename=self._sa_file_path.as_posix())
+			return self._client_factory.get_service_account_credentials(self._sa_file_path,
+			                                                            scopes=self.__class__._SCOPES)
 		elif self._credentials_path and self._sheets_token_path:
-			return gspread.oauth(
-				credentials_filename=self._credentials_path.as_posix(),
-				authorized_user_filename=self._sheets_token_path.as_posix()
-			)
+			return self._client_factory.get_installed_app_credentials(self._credentials_path,
+			                                                          self._sheets_token_path, self.__class__._SCOPES)
 		else:
 			raise TypeError("Please provide at least one valid service account or user account info")
 
+	@cached_property
+	def service(self):
+		return gspread.Client(auth=self.credentials,
+		                      session=self._client_factory.get_authorized_session(self.credentials))
+
 
 if __name__ == "__main__":
+	from dotenv import load_dotenv, find_dotenv
+
+	load_dotenv(find_dotenv())
 	service = GoogleSheetsClient(
 		credentials_path=Path(os.environ.get("GOOGLE_CREDENTIALS_PATH")),
 		sheets_token_path=Path(os.environ.get("GG_SHEETS_TOKEN_PATH"))
@@ -1,85 +1,175 @@
+from __future__ import annotations
+
+import json
+import math
 import re
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
 
 import gspread
-import pandas as pd
-from gspread_dataframe import set_with_dataframe
-from openpyxl.utils.cell import column_index_from_string, get_column_letter
+
+from google_common.Instrumentation import Instrumentation, instrumented
 
 from .GoogleSheetsClient import GoogleSheetsClient
+from .SheetsQuotaLimiter import SheetsQuotaLimiter
+
+# pandas, gspread_dataframe and openpyxl are only imported by the methods that need them
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class GoogleSheetsService:
-    def __init__(self, client: GoogleSheetsClient):
+    _WRITE_MODE = ["FULL", "DIFF"]
+
+    # Every chunked write and append sends RAW values, so a frame gives the same cells whatever the write mode, and DIFF
+    # mode reads back exactly what was written
+    _VALUE_INPUT_OPTION = "RAW"
+
+    def __init__(self, client: GoogleSheetsClient, quota_limiter: SheetsQuotaLimiter = None,
+                 instrumentation: Instrumentation = None):
         self._service = client.service
+        self._quota_limiter = quota_limiter or SheetsQuotaLimiter.from_credentials(client.credentials)
+        self._instrumentation = instrumentation
 
+    @property
+    def quota_limiter(self) -> SheetsQuotaLimiter:
+        return self._quota_limiter
+
+    @instrumented("sheets.open_spreadsheet")
     def open_spreadsheet(self, spreadsheet_key: str) -> gspread.Spreadsheet:
-        return self._service.open_by_key(key=spreadsheet_key)
+        return self._quota_limiter.call("READ", self._service.open_by_key, key=spreadsheet_key)
 
+    @instrumented("sheets.create_spreadsheet")
     def create_spreadsheet(self, spreadsheet_name: str, parent_folder_id: str = None) -> gspread.Spreadsheet:
-        return self._service.create(title=spreadsheet_name, folder_id=parent_folder_id)
+        # A server error may come after the spreadsheet was created, so only rejected requests (429) are retried
+        return self._quota_limiter.call("WRITE", self._service.create, title=spreadsheet_name,
+                                        folder_id=parent_folder_id, retry_status_codes=[429])
 
+    @instrumented("sheets.write_df_to_sheet")
     def write_df_to_sheet(self, worksheet: gspread.Worksheet, df_to_write: pd.DataFrame, starting_cell: str = "A1",
                           include_header: bool = True) -> None:
+        from gspread_dataframe import set_with_dataframe
 
         start_row_int, start_col_int = self.extract_row_and_column_int_from_string(
             starting_cell)
-        set_with_dataframe(worksheet, df_to_write, row=start_row_int, col=start_col_int,
-                           include_column_header=include_header)
+        # set_with_dataframe may resize the worksheet before updating it, which is two write requests
+        self._quota_limiter.call("WRITE", set_with_dataframe, worksheet, df_to_write, row=start_row_int,
+                                 col=start_col_int, include_column_header=include_header, tokens=2)
+
+    @instrumented("sheets.write_df_to_sheet_in_chunks")
+    def write_df_to_sheet_in_chunks(self, worksheet: gspread.Worksheet, df_to_write: pd.DataFrame,
+                                    starting_cell: str = "A1", include_header: bool = True, mode: str = "FULL",
+                                    snapshot_path: Path = None, max_cells_per_request: int = 50000) -> None:
+        """Write a frame with batch updates of at most max_cells_per_request cells each.
+
+        Values are written as RAW, so text such as dates, percentages or formulas is stored as is and not parsed by the
+        sheet. In DIFF mode only the rows that differ from the current sheet contents are sent. When snapshot_path is
+        given the values written by the previous call are read from that file instead of the sheet, which assumes nobody
+        else edits the range in between. Only a snapshot tells which cells the previous frame covered, so cells left
+        over from a bigger previous frame are cleared with a snapshot only. Without one, DIFF mode compares and writes
+        the frame's own area, like FULL mode.
+        """
+        if mode not in self.__class__._WRITE_MODE:
+            raise ValueError(f"Write mode must be either {', '.join(self.__class__._WRITE_MODE)}")
+
+        start_row_int, start_col_int = self.extract_row_and_column_int_from_string(
+            starting_cell)
+        values = self._convert_df_to_values(df_to_write, include_header)
+        if not values:
+            return
+
+        end_row_int, end_col_int = start_row_int + len(values) - 1, start_col_int + len(values[0]) - 1
+        self._resize_worksheet_to_fit(worksheet, end_row_int, end_col_int)
+
+        if mode == "DIFF":
+            previous_values = self._read_snapshot(snapshot_path, starting_cell)
+            if previous_values is None:
+                # Cells outside the frame may hold unrelated data, they are neither compared nor cleared
+                previous_values = self._read_unformatted_values(worksheet, start_row_int, start_col_int, end_row_int,
+                                                                end_col_int)
+            blocks = self._get_changed_row_blocks(values, previous_values, start_row_int, start_col_int)
+        else:
+            blocks = [(start_row_int, start_col_int, values)]
+
+        self._batch_update_values(worksheet, blocks, max_cells_per_request)
+
+        if snapshot_path:
+            snapshot_path.write_text(json.dumps({"starting_cell": starting_cell, "values": values}))
 
+    @instrumented("sheets.append_df_to_sheet")
+    def append_df_to_sheet(self, worksheet: gspread.Worksheet, df_to_append: pd.DataFrame,
+                           max_cells_per_request: int = 50000) -> None:
+        values = self._convert_df_to_values(df_to_append, include_header=False)
+        if not values:
+            return
+
+        rows_per_request = max(max_cells_per_request // len(values[0]), 1)
+        for offset in range(0, len(values), rows_per_request):
+            # A failed append may still have been applied, so only rejected requests (429) are retried
+            self._quota_limiter.call("WRITE", worksheet.append_rows, values[offset:offset + rows_per_request],
+                                     value_input_option=self.__class__._VALUE_INPUT_OPTION,
+                                     insert_data_option="INSERT_ROWS",
+                                     retry_status_codes=[429])
+
+    @instrumented("sheets.read_data_from_sheet_to_pandas")
     def read_data_from_sheet_to_pandas(self, worksheet: gspread.Worksheet, starting_cell_str: str = "A1",
                                        end_cell_row: int = None, end_cell_col_str: str = None,
                                        include_header: bool = True):
-        data: list[list[str]] = worksheet.get_all_values()
-        if len(data) == 0 or len(data[0]) == 0:
-            return
-
         starting_cell_row, starting_cell_col = self.extract_row_and_column_int_from_string(
             starting_cell_str)
 
-        if (not end_cell_row) or (end_cell_row > len(data)):
-            end_cell_row = len(data)
+        # gspread does not refresh the cached grid size after appends, so the rows are left open-ended (the API trims
+        # them to the data) and only a bound given by the caller is applied
+        end_cell_row_str: str = ""
+        if end_cell_row and end_cell_row <= worksheet.row_count:
+            end_cell_row_str = str(end_cell_row)
 
         if (not end_cell_col_str) or (
-                self.extract_row_and_column_int_from_string(end_cell_col_str)[1] > len(data[0])):
-            end_cell_col: int = len(data[0])
+                self.extract_row_and_column_int_from_string(end_cell_col_str)[1] > worksheet.col_count):
+            end_cell_col: int = worksheet.col_count
         else:
             end_cell_col: int = self.extract_row_and_column_int_from_string(end_cell_col_str)[
                 1]
 
-        if include_header:
-            if len(data) == 1:
-                return pd.DataFrame(columns=data[0])
-
-            header_range_str: str = f"R{starting_cell_row}C{starting_cell_col}:R{starting_cell_row}C{end_cell_col}"
-            data_range_str: str = f"R{starting_cell_row + 1}C{starting_cell_col}:R{end_cell_row}C{end_cell_col}"
-
-            try:
-                columns_list: list[str] = worksheet.get(header_range_str)[0]
-            except IndexError:
-                columns_list: list[str] = [""] * \
-                    (end_cell_col - starting_cell_col + 1)
+        range_str: str = f"{self.convert_column_int_to_string(starting_cell_col)}{starting_cell_row}:" \
+                         f"{self.convert_column_int_to_string(end_cell_col)}{end_cell_row_str}"
+        values: list[list[str]] = self._quota_limiter.call(
+            "READ", worksheet.spreadsheet.values_get,
+            gspread.utils.absolute_range_name(worksheet.title, range_str)).get("values", [])
+        if end_cell_row:
+            values = values[:max(end_cell_row - starting_cell_row + 1, 0)]
 
-            df_values = worksheet.get(data_range_str)
+        return self._build_dataframe_from_values(values, include_header)
 
-            columns_list = self._fill_columns_list(
-                columns_list, end_cell_col - starting_cell_col + 1)
+    @instrumented("sheets.read_ranges_from_spreadsheet_to_pandas")
+    def read_ranges_from_spreadsheet_to_pandas(self, spreadsheet: gspread.Spreadsheet,
+                                               range_list: list[tuple[str, Optional[str]]],
+                                               include_header: bool = True,
+                                               max_workers: int = None) -> dict[tuple[str, Optional[str]], pd.DataFrame]:
+        """Read (worksheet title, A1 range) pairs with one batchGet call, a range of None reads the whole worksheet.
 
-            if len(columns_list) > max([len(row) for row in df_values]):
-                columns_list = columns_list[:max(
-                    [len(row) for row in df_values])]
-
-            return pd.DataFrame(data=df_values, columns=columns_list).replace("", None)
+        The frames are keyed by their (worksheet title, A1 range) pair and parsed in a thread pool when max_workers is
+        given.
+        """
+        range_names: list[str] = [gspread.utils.absolute_range_name(worksheet_title, range_str)
+                                  for worksheet_title, range_str in range_list]
+        value_ranges: list[dict] = self._quota_limiter.call("READ", spreadsheet.values_batch_get,
+                                                            range_names).get("valueRanges", [])
+        values_list: list[list[list[str]]] = [value_range.get("values", []) for value_range in value_ranges]
 
+        if max_workers:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                df_list = list(executor.map(lambda values: self._build_dataframe_from_values(values, include_header),
+                                            values_list))
         else:
-            data_range_str: str = f"R{starting_cell_row}C{starting_cell_col}:R{end_cell_row}C{end_cell_col}"
-
-            df_values = worksheet.get(data_range_str)
+            df_list = [self._build_dataframe_from_values(values, include_header) for values in values_list]
 
-            return pd.DataFrame(data=df_values)
+        return dict(zip(range_list, df_list))
 
     @staticmethod
     def extract_row_and_column_int_from_string(cell_string: str) -> tuple[Optional[int], Optional[int]]:
+        from openpyxl.utils.cell import column_index_from_string
 
         try:
             row_value: int = int("".join(re.findall(r"[0-9]*$", cell_string)))
@@ -100,8 +190,150 @@ class GoogleSheetsService:
 
     @staticmethod
     def convert_column_int_to_string(col_int: int) -> str:
+        from openpyxl.utils.cell import get_column_letter
+
         return get_column_letter(col_int)
 
+    @classmethod
+    def _convert_df_to_values(cls, df: pd.DataFrame, include_header: bool = True) -> list[list]:
+        values: list[list] = [[cls._convert_cell_value(cell) for cell in row]
+                              for row in df.astype(object).values.tolist()]
+        if include_header:
+            values.insert(0, [str(col) for col in df.columns])
+
+        return values
+
+    @staticmethod
+    def _convert_cell_value(value):
+        import pandas as pd
+
+        if value is None:
+            return ""
+        if isinstance(value, (bool, int, str)):
+            return value
+        if isinstance(value, float):
+            if math.isnan(value):
+                return ""
+            return value if not math.isinf(value) else str(value)
+        try:
+            if pd.isna(value):
+                return ""
+        except (TypeError, ValueError):
+            pass
+
+        return str(value)
+
+    @staticmethod
+    def _check_cell_values_equal(new_value, old_value) -> bool:
+        if new_value == old_value:
+            return True
+        if isinstance(new_value, (int, float)) and isinstance(old_value, (int, float)) and \
+                not isinstance(new_value, bool) and not isinstance(old_value, bool):
+            return float(new_value) == float(old_value)
+
+        # Values from a JSON snapshot or from a cell edited by hand may differ in type only, e.g. "12" and 12
+        return str(new_value) == str(old_value)
+
+    @classmethod
+    def _get_changed_row_blocks(cls, values: list[list], previous_values: list[list], start_row: int,
+                                start_col: int) -> list[tuple[int, int, list[list]]]:
+        width: int = max([len(row) for row in values + previous_values])
+        blocks: list[tuple[int, int, list[list]]] = []
+
+        for i in range(max(len(values), len(previous_values))):
+            new_row = values[i] if i < len(values) else []
+            old_row = previous_values[i] if i < len(previous_values) else []
+            # Rows are padded so that cells left over from a bigger previous frame are cleared
+            new_row = new_row + [""] * (width - len(new_row))
+            old_row = old_row + [""] * (width - len(old_row))
+
+            if all(cls._check_cell_values_equal(new_cell, old_cell) for new_cell, old_cell in zip(new_row, old_row)):
+                continue
+
+            if blocks and blocks[-1][0] + len(blocks[-1][2]) == start_row + i:
+                blocks[-1][2].append(new_row)
+            else:
+                blocks.append((start_row + i, start_col, [new_row]))
+
+        return blocks
+
+    @staticmethod
+    def _read_snapshot(snapshot_path: Optional[Path], starting_cell: str) -> Optional[list[list]]:
+        if not snapshot_path or not snapshot_path.exists():
+            return None
+
+        snapshot = json.loads(snapshot_path.read_text())
+        if snapshot.get("starting_cell") != starting_cell:
+            return None
+
+        return snapshot.get("values")
+
+    def _read_unformatted_values(self, worksheet: gspread.Worksheet, start_row: int, start_col: int, end_row: int,
+                                 end_col: int) -> list[list]:
+        range_str: str = f"{self.convert_column_int_to_string(start_col)}{start_row}:" \
+                         f"{self.convert_column_int_to_string(end_col)}{end_row}"
+
+        return self._quota_limiter.call("READ", worksheet.spreadsheet.values_get,
+                                        gspread.utils.absolute_range_name(worksheet.title, range_str),
+                                        params={"valueRenderOption": "UNFORMATTED_VALUE"}).get("values", [])
+
+    def _resize_worksheet_to_fit(self, worksheet: gspread.Worksheet, end_row: int, end_col: int):
+        if end_row > worksheet.row_count or end_col > worksheet.col_count:
+            self._quota_limiter.call("WRITE", worksheet.resize, rows=max(end_row, worksheet.row_count),
+                                     cols=max(end_col, worksheet.col_count))
+
+    def _batch_update_values(self, worksheet: gspread.Worksheet, blocks: list[tuple[int, int, list[list]]],
+                             max_cells_per_request: int):
+        for request_data in self._chunk_update_requests(blocks, max_cells_per_request):
+            self._quota_limiter.call("WRITE", worksheet.batch_update, request_data,
+                                     value_input_option=self.__class__._VALUE_INPUT_OPTION)
+
+    @classmethod
+    def _chunk_update_requests(cls, blocks: list[tuple[int, int, list[list]]], max_cells_per_request: int):
+        request_data: list[dict] = []
+        request_cells: int = 0
+
+        for start_row, start_col, rows in blocks:
+            width: int = max(max(len(row) for row in rows), 1)
+            rows_per_chunk: int = max(max_cells_per_request // width, 1)
+
+            for offset in range(0, len(rows), rows_per_chunk):
+                chunk = rows[offset:offset + rows_per_chunk]
+                if request_data and request_cells + len(chunk) * width > max_cells_per_request:
+                    yield request_data
+                    request_data, request_cells = [], 0
+
+                range_str: str = f"{cls.convert_column_int_to_string(start_col)}{start_row + offset}:" \
+                                 f"{cls.convert_column_int_to_string(start_col + width - 1)}" \
+                                 f"{start_row + offset + len(chunk) - 1}"
+                request_data.append({"range": range_str, "values": chunk})
+                request_cells += len(chunk) * width
+
+        if request_data:
+            yield request_data
+
+    @classmethod
+    def _build_dataframe_from_values(cls, values: list[list[str]], include_header: bool = True) \
+            -> Optional[pd.DataFrame]:
+        import pandas as pd
+
+        if not any(values):
+            return
+
+        if not include_header:
+            return pd.DataFrame(data=values)
+
+        if len(values) == 1:
+            return pd.DataFrame(columns=values[0])
+
+        # The API trims trailing empty cells, so rows are padded to the widest one while empty strings become None
+        data_width: int = max(len(row) for row in values[1:])
+        df_values = [[cell if cell != "" else None for cell in row] + [None] * (data_width - len(row))
+                     for row in values[1:]]
+        columns_list = cls._fill_columns_list(list(values[0]), data_width)[:data_width]
+
+        return pd.DataFrame(data=df_values, columns=columns_list)
+
     @staticmethod
     def _fill_columns_list(columns_list: list[str], list_length: int) -> list[str]:
         count: int = 0
@@ -0,0 +1,131 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Callable
+
+import gspread
+
+from google_common.Instrumentation import record_retry
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self._capacity = capacity
+        self._refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> float:
+        wait_seconds = self.reserve(tokens)
+        if wait_seconds:
+            time.sleep(wait_seconds)
+
+        return wait_seconds
+
+    def reserve(self, tokens: int = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._refill_per_second)
+            self._last_refill = now
+            # Tokens are reserved even when the balance goes negative, so waiting callers are served in order
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self._refill_per_second)
+
+
+class SheetsQuotaLimiter:
+    """Keep Sheets calls under the per minute quotas, shared by every limiter of the same project and user.
+
+    Each call takes a token from the project bucket and from the user bucket of its kind (READ or WRITE) and is retried
+    with jittered exponential backoff on 429 and 5xx responses.
+    """
+    _KIND = ["READ", "WRITE"]
+
+    _RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+    _buckets: dict[tuple[str, ...], TokenBucket] = dict()
+    _buckets_lock = threading.Lock()
+
+    def __init__(self, project_id: str, user_id: str, project_requests_per_minute: int = 300,
+                 user_requests_per_minute: int = 60, max_retries: int = 5, max_backoff_seconds: float = 64):
+        self._project_buckets = {
+            kind: self._get_shared_bucket(("project", project_id, kind), project_requests_per_minute)
+            for kind in self.__class__._KIND
+        }
+        self._user_buckets = {
+            kind: self._get_shared_bucket(("user", project_id, user_id, kind), user_requests_per_minute)
+            for kind in self.__class__._KIND
+        }
+        self._max_retries = max_retries
+        self._max_backoff_seconds = max_backoff_seconds
+
+        self._metrics_lock = threading.Lock()
+        self._metrics: dict[str, float] = {
+            "read_calls": 0,
+            "write_calls": 0,
+            "retries": 0,
+            "throttled_seconds": 0.0,
+            "backoff_seconds": 0.0
+        }
+
+    @classmethod
+    def from_credentials(cls, credentials, **kwargs) -> "SheetsQuotaLimiter":
+        project_id = getattr(credentials, "project_id", None) or getattr(credentials, "quota_project_id", None)
+        user_id = getattr(credentials, "service_account_email", None) or getattr(credentials, "account", None) or \
+            getattr(credentials, "client_id", None)
+
+        return cls(project_id=project_id or "default", user_id=user_id or "default", **kwargs)
+
+    def get_metrics(self) -> dict[str, float]:
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def call(self, kind: str, func: Callable, *args, tokens: int = 1, retry_status_codes: list[int] = None, **kwargs):
+        """Non-idempotent calls (creates, appends) must pass retry_status_codes=[429], a 5xx may come after the call
+        was applied."""
+        if kind not in self.__class__._KIND:
+            raise ValueError(f"Kind must be either {', '.join(self.__class__._KIND)}")
+
+        retry_status_codes = retry_status_codes or self.__class__._RETRY_STATUS_CODES
+
+        for attempt in range(self._max_retries + 1):
+            throttled_seconds = self._project_buckets[kind].acquire(tokens) + self._user_buckets[kind].acquire(tokens)
+            self._add_metrics(**{f"{kind.lower()}_calls": 1, "throttled_seconds": throttled_seconds})
+
+            try:
+                return func(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                if attempt == self._max_retries or e.response.status_code not in retry_status_codes:
+                    raise
+
+                backoff_seconds = random.uniform(0, min(2 ** attempt, self._max_backoff_seconds))
+                self._add_metrics(retries=1, backoff_seconds=backoff_seconds)
+                record_retry()
+                time.sleep(backoff_seconds)
+
+    async def acquire_async(self, kind: str, tokens: int = 1) -> float:
+        if kind not in self.__class__._KIND:
+            raise ValueError(f"Kind must be either {', '.join(self.__class__._KIND)}")
+
+        # Both reservations are taken at once, so the caller waits for the slower bucket only
+        throttled_seconds = max(self._project_buckets[kind].reserve(tokens), self._user_buckets[kind].reserve(tokens))
+        self._add_metrics(**{f"{kind.lower()}_calls": 1, "throttled_seconds": throttled_seconds})
+        if throttled_seconds:
+            await asyncio.sleep(throttled_seconds)
+
+        return throttled_seconds
+
+    def _add_metrics(self, **metric_increments: float):
+        with self._metrics_lock:
+            for metric_name, increment in metric_increments.items():
+                self._metrics[metric_name] += increment
+
+    @classmethod
+    def _get_shared_bucket(cls, key: tuple[str, ...], requests_per_minute: int) -> TokenBucket:
+        with cls._buckets_lock:
+            if key not in cls._buckets:
+                cls._buckets[key] = TokenBucket(capacity=requests_per_minute,
+                                                refill_per_second=requests_per_minute / 60)
+
+            return cls._buckets[key]
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("google.cloud.bigquery")
+
+from bigquery_service.BigqueryQueryCache import BigqueryQueryCache
+from bigquery_service.BigqueryService import BigqueryService
+
+
+class FakeBigqueryService:
+	def __init__(self, statement_type: str = "SELECT", table_count: int = 1, table_type: str = "TABLE",
+	             streaming_buffer=None):
+		self.dry_run_count = 0
+		self._statement_type = statement_type
+		self._table_refs = [SimpleNamespace(project="project", dataset_id="dataset", table_id=f"table_{index}")
+		                    for index in range(table_count)]
+		self._table_type = table_type
+		self._streaming_buffer = streaming_buffer
+
+	def query(self, query_str, job_config=None):
+		self.dry_run_count += 1
+		return SimpleNamespace(statement_type=self._statement_type, referenced_tables=self._table_refs)
+
+	def get_table(self, table_ref):
+		return SimpleNamespace(project=table_ref.project, dataset_id=table_ref.dataset_id, table_id=table_ref.table_id,
+		                       table_type=self._table_type, streaming_buffer=self._streaming_buffer,
+		                       modified=datetime(2024, 1, 1))
+
+
+def create_bigquery_service(fake_service: FakeBigqueryService) -> BigqueryService:
+	return BigqueryService(SimpleNamespace(service=fake_service))
+
+
+def test_normalize_query_keeps_whitespace_inside_string_literals():
+	first_key = BigqueryQueryCache.create_cache_key("SELECT * FROM t WHERE name = 'a  b'", dict())
+	second_key = BigqueryQueryCache.create_cache_key("SELECT * FROM t WHERE name = 'a b'", dict())
+
+	assert first_key != second_key
+
+
+def test_normalize_query_strips_trailing_semicolon():
+	assert BigqueryQueryCache.normalize_query("  SELECT 1;\n") == "SELECT 1"
+
+
+def test_select_query_is_cached():
+	fake_service = FakeBigqueryService()
+
+	assert create_bigquery_service(fake_service)._get_query_cache_key("SELECT * FROM t") is not None
+
+
+@pytest.mark.parametrize("query_str", [
+	"SELECT * FROM t WHERE day = CURRENT_DATE()",
+	"SELECT * FROM t WHERE ts < current_timestamp()",
+	"SELECT * FROM t WHERE RAND() < 0.1",
+	"SELECT GENERATE_UUID() AS id, * FROM t"
+])
+def test_non_deterministic_query_is_not_cached(query_str):
+	fake_service = FakeBigqueryService()
+
+	assert create_bigquery_service(fake_service)._get_query_cache_key(query_str) is None
+	assert fake_service.dry_run_count == 0
+
+
+@pytest.mark.parametrize("statement_type", ["CREATE_TABLE_AS_SELECT", "INSERT", "MERGE", "SCRIPT"])
+def test_non_select_statement_is_not_cached(statement_type):
+	fake_service = FakeBigqueryService(statement_type=statement_type)
+
+	assert create_bigquery_service(fake_service)._get_query_cache_key("CREATE OR REPLACE TABLE x AS SELECT 1") is None
+
+
+def test_query_with_truncated_referenced_tables_is_not_cached():
+	fake_service = FakeBigqueryService(table_count=50)
+
+	assert create_bigquery_service(fake_service)._get_query_cache_key("SELECT * FROM t") is None
+
+
+@pytest.mark.parametrize("table_type, streaming_buffer", [("EXTERNAL", None), ("TABLE", object())])
+def test_query_on_external_or_streaming_table_is_not_cached(table_type, streaming_buffer):
+	fake_service = FakeBigqueryService(table_type=table_type, streaming_buffer=streaming_buffer)
+
+	assert create_bigquery_service(fake_service)._get_query_cache_key("SELECT * FROM t") is None
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.cloud.bigquery")
+
+from bigquery_service.BigqueryService import BigqueryService
+
+
+def test_create_merge_query():
+	merge_query = BigqueryService._create_merge_query("p.d.t", "p.d.s", ["id", "value"], ["id"])
+
+	assert merge_query == "MERGE `p.d.t` T\nUSING `p.d.s` S\nON T.`id` = S.`id`\n" \
+	                      "WHEN MATCHED THEN UPDATE SET `value` = S.`value`\n" \
+	                      "WHEN NOT MATCHED THEN INSERT (`id`, `value`) VALUES (S.`id`, S.`value`)"
+
+
+def test_create_merge_query_with_partition_filter_and_only_key_columns():
+	merge_query = BigqueryService._create_merge_query("p.d.t", "p.d.s", ["id", "day"], ["id", "day"],
+	                                                  partition_filter="T.`day` BETWEEN @min_day AND @max_day")
+
+	assert merge_query == "MERGE `p.d.t` T\nUSING `p.d.s` S\n" \
+	                      "ON T.`id` = S.`id` AND T.`day` = S.`day` AND T.`day` BETWEEN @min_day AND @max_day\n" \
+	                      "WHEN NOT MATCHED THEN INSERT (`id`, `day`) VALUES (S.`id`, S.`day`)"
+
+
+class FakeMergeBigqueryService:
+	def __init__(self):
+		self.query_list: list[str] = []
+
+	def query(self, query_str, job_config=None):
+		self.query_list.append(query_str)
+		stats = SimpleNamespace(row_count=2, partition_value_count=2, min_value="2024-01-01", max_value="2024-01-02")
+
+		return SimpleNamespace(result=lambda: [stats])
+
+
+def create_partitioned_table() -> SimpleNamespace:
+	return SimpleNamespace(project="p", dataset_id="d", table_id="t", range_partitioning=None,
+	                       time_partitioning=SimpleNamespace(field="day"),
+	                       schema=[SimpleNamespace(name="id", field_type="INTEGER"),
+	                               SimpleNamespace(name="day", field_type="DATE")])
+
+
+@pytest.mark.parametrize("key_columns, expect_partition_filter", [(["id"], False), (["id", "day"], True)])
+def test_merge_filters_partitions_only_when_partition_column_is_a_key(key_columns, expect_partition_filter):
+	fake_service = FakeMergeBigqueryService()
+	bigquery_service = BigqueryService(SimpleNamespace(service=fake_service))
+
+	bigquery_service._merge_staging_table_into_table("p.d.s", create_partitioned_table(), ["id", "day"], key_columns)
+
+	assert ("BETWEEN @partition_min_value AND @partition_max_value" in fake_service.query_list[-1]) == \
+	       expect_partition_filter
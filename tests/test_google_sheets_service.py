@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+pytest.importorskip("gspread")
+
+from google_sheets_service.GoogleSheetsService import GoogleSheetsService
+
+
+@pytest.mark.parametrize("value, expected", [
+	(None, ""),
+	(float("nan"), ""),
+	(math.inf, "inf"),
+	(True, True),
+	(12, 12),
+	(1.5, 1.5),
+	("text", "text"),
+	(pd.NaT, ""),
+	(pd.Timestamp("2024-01-01"), "2024-01-01 00:00:00"),
+	([1, 2], "[1, 2]")
+])
+def test_convert_cell_value(value, expected):
+	assert GoogleSheetsService._convert_cell_value(value) == expected
+
+
+def test_get_changed_row_blocks_skips_equal_rows():
+	values = [["a", "b"], [1, 2], ["12", 4.0]]
+	previous_values = [["a", "b"], [1.0, 2], [12, 4]]
+
+	assert GoogleSheetsService._get_changed_row_blocks(values, previous_values, 1, 1) == []
+
+
+def test_get_changed_row_blocks_merges_adjacent_rows():
+	values = [["a", "b"], [1, 2], [3, 4], [5, 6]]
+	previous_values = [["a", "b"], [1, 9], [3, 9], [5, 6]]
+
+	assert GoogleSheetsService._get_changed_row_blocks(values, previous_values, 2, 3) == [
+		(3, 3, [[1, 2], [3, 4]])
+	]
+
+
+def test_get_changed_row_blocks_clears_left_over_cells():
+	values = [["a"], [1]]
+	previous_values = [["a", "b"], [1, 2], [3, 4]]
+
+	assert GoogleSheetsService._get_changed_row_blocks(values, previous_values, 1, 1) == [
+		(1, 1, [["a", ""], [1, ""], ["", ""]])
+	]
+
+
+def test_chunk_update_requests_splits_on_cell_limit():
+	blocks = [(1, 1, [[1, 2], [3, 4], [5, 6]])]
+
+	assert list(GoogleSheetsService._chunk_update_requests(blocks, 4)) == [
+		[{"range": "A1:B2", "values": [[1, 2], [3, 4]]}],
+		[{"range": "A3:B3", "values": [[5, 6]]}]
+	]
+
+
+def test_chunk_update_requests_packs_small_blocks_together():
+	blocks = [(1, 1, [[1]]), (5, 2, [[2, 3]])]
+
+	assert list(GoogleSheetsService._chunk_update_requests(blocks, 10)) == [
+		[{"range": "A1:A1", "values": [[1]]}, {"range": "B5:C5", "values": [[2, 3]]}]
+	]
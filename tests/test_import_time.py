@@ -0,0 +1,56 @@
+"""Cold import time budgets of the service modules, measured with python -X importtime.
+
+Wall clock budgets depend on the machine, so these tests only run when RUN_IMPORT_TIME_TESTS is set.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_IMPORT_TIME_TESTS"),
+                                reason="Import time budgets only run when RUN_IMPORT_TIME_TESTS is set")
+
+# Cumulative import time budgets in milliseconds, about twice the measured times. The BigQuery and Sheets services
+# import their Google client library at import time, the Gmail, Drive and GCS services only need the standard library
+# until the first call.
+IMPORT_TIME_BUDGET_MS = {
+	"gmail_service.GmailService": 100,
+	"google_drive_service.GoogleDriveService": 100,
+	"gcs_service.GcsService": 100,
+	"google_sheets_service.GoogleSheetsService": 600,
+	"bigquery_service.BigqueryService": 1600,
+}
+
+_REPEAT = 5
+
+
+def measure_import_time_ms(module_name: str) -> float:
+	try:
+		result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"], cwd=_REPO_ROOT,
+		                        capture_output=True, text=True, check=True)
+	except subprocess.CalledProcessError as e:
+		error_line = e.stderr.splitlines()[-1] if e.stderr else ""
+		# Like importorskip in the other test modules, a missing requirement skips the budget instead of failing it
+		if error_line.startswith("ModuleNotFoundError"):
+			pytest.skip(f"Importing {module_name} needs a missing dependency: {error_line}")
+		pytest.fail(f"Importing {module_name} failed:\n{error_line}")
+
+	# Each line has the form "import time: <self us> | <cumulative us> | <indented module name>"
+	for line in result.stderr.splitlines():
+		parts = line.split("|")
+		if len(parts) == 3 and parts[2].strip() == module_name:
+			return int(parts[1]) / 1000
+
+	pytest.fail(f"Module {module_name} was not found in the import time report")
+
+
+@pytest.mark.parametrize("module_name, budget_ms", IMPORT_TIME_BUDGET_MS.items())
+def test_import_time_is_within_budget(module_name, budget_ms):
+	# The fastest run is the least affected by disk cache and scheduler noise
+	import_time_ms = min(measure_import_time_ms(module_name) for _ in range(_REPEAT))
+
+	assert import_time_ms <= budget_ms, f"{module_name} imports in {import_time_ms:.1f} ms, budget is {budget_ms} ms"
@@ -0,0 +1,83 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from google_common.Instrumentation import InMemoryAggregator, Instrumentation, instrumented, iter_page_items, \
+	map_in_context, record_http_call, record_retry
+
+
+class FakeService:
+	def __init__(self, instrumentation: Instrumentation = None):
+		self._instrumentation = instrumentation
+
+	@instrumented("fake.get")
+	def get(self):
+		record_http_call(10, 20, 200)
+
+	@instrumented("fake.get_twice")
+	def get_twice(self):
+		record_retry()
+		self.get()
+		self.get()
+
+	@instrumented("fake.get_in_threads")
+	def get_in_threads(self, count: int):
+		with ThreadPoolExecutor(max_workers=4) as executor:
+			map_in_context(executor, lambda _: record_http_call(1, 1, 200), range(count))
+
+	@instrumented("fake.list_items")
+	def list_items(self):
+		return list(iter_page_items(SimpleNamespace(pages=[[1, 2], [3]])))
+
+	@instrumented("fake.iter_items")
+	async def iter_items(self):
+		for item in range(3):
+			record_http_call(0, 1, 200)
+			yield item
+
+
+def create_fake_service() -> tuple[FakeService, InMemoryAggregator]:
+	aggregator = InMemoryAggregator()
+
+	return FakeService(Instrumentation([aggregator])), aggregator
+
+
+def test_nested_calls_are_folded_into_the_outer_span():
+	service, aggregator = create_fake_service()
+	service.get_twice()
+
+	summary = aggregator.get_summary()
+	assert list(summary) == ["fake.get_twice"]
+	assert summary["fake.get_twice"]["request_count"] == 2
+	assert summary["fake.get_twice"]["retry_count"] == 1
+	assert summary["fake.get_twice"]["response_bytes"] == 40
+
+
+def test_thread_pool_calls_count_toward_the_span():
+	service, aggregator = create_fake_service()
+	service.get_in_threads(100)
+
+	assert aggregator.get_summary()["fake.get_in_threads"]["request_count"] == 100
+
+
+def test_pages_are_recorded():
+	service, aggregator = create_fake_service()
+
+	assert service.list_items() == [1, 2, 3]
+	assert aggregator.get_summary()["fake.list_items"]["page_count"] == 2
+
+
+def test_async_generator_is_one_span():
+	service, aggregator = create_fake_service()
+
+	async def __collect():
+		return [item async for item in service.iter_items()]
+
+	assert asyncio.run(__collect()) == [0, 1, 2]
+	assert aggregator.get_summary()["fake.iter_items"]["request_count"] == 3
+
+
+def test_calls_without_instrumentation_pass_through():
+	service = FakeService()
+	service.get_twice()
+	assert service.list_items() == [1, 2, 3]